@@ -1,12 +1,18 @@
-from fastapi import FastAPI, HTTPException, Depends, Header
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Annotated
+from typing import List, Optional, Dict, Annotated, Iterator, Union
+from collections import Counter
 from statemachine import StateMachine, State
 from statemachine.exceptions import TransitionNotAllowed
 import redis
 import json
 import uuid
+import hashlib
 import os
+import time
 from datetime import datetime
 from enum import Enum
 import logging
@@ -17,6 +23,9 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="State Machine Warehouse Service", version="1.0.0")
 
+# Compress large responses (order listings) for clients sending Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Redis connection with environment variables
 REDIS_HOST = os.getenv("REDIS_HOST", "redis")
 REDIS_PORT = int(os.getenv("REDIS_PORT", "6379"))
@@ -103,6 +112,37 @@ TRANSITION_PERMISSIONS = {
     "resume_to_packed": [Role.FULFILLMENT],
 }
 
+# Transitions resolved server-side from an order's current state by the shortcut endpoints
+CANCEL_TRANSITIONS = {
+    "pending": "cancel_from_pending",
+    "confirmed": "cancel_from_confirmed",
+    "picking": "cancel_from_picking",
+    "packed": "cancel_from_packed",
+    "delivered": "return_order",
+}
+
+# Happy-path fulfillment chain walked by the advance-to shortcut
+FORWARD_TRANSITIONS = [
+    ("confirm", "confirmed"),
+    ("start_picking", "picking"),
+    ("pack", "packed"),
+    ("ship", "shipped"),
+    ("deliver", "delivered"),
+]
+
+# State an order just reached on the happy path -> the forward transition that follows it
+NEXT_FORWARD_TRANSITION = {
+    state: next_transition
+    for (_, state), (next_transition, _) in zip(FORWARD_TRANSITIONS, FORWARD_TRANSITIONS[1:])
+}
+
+HALT_TRANSITIONS = {
+    "pending": "halt_from_pending",
+    "confirmed": "halt_from_confirmed",
+    "picking": "halt_from_picking",
+    "packed": "halt_from_packed",
+}
+
 # ============================================================================
 # ORDER MODEL FOR STATE MACHINE
 # ============================================================================
@@ -138,6 +178,14 @@ class TransitionRequest(BaseModel):
     notes: Optional[str] = None
     agent_id: Optional[str] = None
 
+class OrderActionRequest(BaseModel):
+    notes: Optional[str] = None
+    agent_id: Optional[str] = None
+
+class AdvanceRequest(BaseModel):
+    target: str
+    notes: Optional[str] = None
+
 class QueueTask(BaseModel):
     task_id: str
     order_id: str
@@ -157,6 +205,9 @@ class TaskQueue:
     def __init__(self, redis_client):
         self.redis = redis_client
         self.lock_timeout = 300  # 5 minutes
+        # Longest a claim may long-poll for a task, in seconds. Each waiting claim holds one
+        # of the server's sync worker threads (40 by default) for that long, so keep it short.
+        self.max_wait = 5
     
     def _get_queue_key(self, role: Role) -> str:
         """Get role-specific queue key"""
@@ -186,8 +237,9 @@ class TaskQueue:
         logger.info(f"Enqueued transition task {task_id}: {transition} for order {order_id} in {role.value} queue")
         return task_id
     
-    def claim_next_task(self, agent_id: str, role: Role) -> Optional[QueueTask]:
-        """Atomically claim the next available task from role-specific queue"""
+    def claim_next_task(self, agent_id: str, role: Role, wait: float = 0) -> Optional[QueueTask]:
+        """Atomically claim the next available task from role-specific queue,
+        holding the request up to `wait` seconds for a task to arrive"""
         queue_key = self._get_queue_key(role)
         processing_key = self._get_processing_key(agent_id)
         
@@ -207,6 +259,16 @@ class TaskQueue:
         """
         
         task_json = self.redis.eval(lua_script, 2, queue_key, processing_key, self.lock_timeout)
+        deadline = time.monotonic() + min(max(wait, 0), self.max_wait)
+        while not task_json:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Block in Redis rather than polling. Moving the tail back onto the tail of the
+            # same list leaves the queue untouched, so this is only a wake-up: the task is
+            # still claimed by the atomic script, and nothing can be stranded in between.
+            if self.redis.blmove(queue_key, queue_key, remaining, "RIGHT", "RIGHT"):
+                task_json = self.redis.eval(lua_script, 2, queue_key, processing_key, self.lock_timeout)
         
         if task_json:
             try:
@@ -287,29 +349,40 @@ class OrderManager:
         
     def create_order(self, order_data: OrderCreate) -> str:
         """Create a new order"""
-        order_id = str(uuid.uuid4())
-        timestamp = datetime.utcnow().isoformat()
-        
-        order = {
-            "order_id": order_id,
-            "customer_name": order_data.customer_name,
-            "items": json.dumps(order_data.items),
-            "current_state": "pending",
-            "notes": order_data.notes or "",
-            "created_at": timestamp,
-            "updated_at": timestamp,
-            "history": json.dumps([{
-                "state": "pending",
-                "timestamp": timestamp,
-                "notes": "Order created"
-            }])
-        }
+        return self.create_orders([order_data])[0]
+    
+    def create_orders(self, orders_data: List[OrderCreate]) -> List[str]:
+        """Create several orders, writing them all in one pipelined round trip"""
+        order_ids = []
+        pipe = self.redis.pipeline(transaction=False)
         
-        self.redis.hset(f"order:{order_id}", mapping=order)
-        self.redis.sadd("orders", order_id)
+        for order_data in orders_data:
+            order_id = str(uuid.uuid4())
+            timestamp = datetime.utcnow().isoformat()
+            
+            order = {
+                "order_id": order_id,
+                "customer_name": order_data.customer_name,
+                "items": json.dumps(order_data.items),
+                "current_state": "pending",
+                "notes": order_data.notes or "",
+                "created_at": timestamp,
+                "updated_at": timestamp,
+                "history": json.dumps([{
+                    "state": "pending",
+                    "timestamp": timestamp,
+                    "notes": "Order created"
+                }])
+            }
+            
+            pipe.hset(f"order:{order_id}", mapping=order)
+            pipe.sadd("orders", order_id)
+            order_ids.append(order_id)
         
-        logger.info(f"Created order {order_id} for {order_data.customer_name}")
-        return order_id
+        pipe.execute()
+        for order_id, order_data in zip(order_ids, orders_data):
+            logger.info(f"Created order {order_id} for {order_data.customer_name}")
+        return order_ids
     
     def get_order(self, order_id: str) -> Optional[OrderResponse]:
         """Retrieve an order with error handling"""
@@ -334,6 +407,10 @@ class OrderManager:
     
     def atomic_state_transition(self, order_id: str, transition: str, notes: str = None) -> bool:
         """Atomically execute state transition and update order"""
+        return self.atomic_state_transitions(order_id, [transition], notes)
+    
+    def atomic_state_transitions(self, order_id: str, transitions: List[str], notes: str = None) -> bool:
+        """Atomically execute a sequence of state transitions; either all apply or none do"""
         
         # Use optimistic locking with WATCH
         pipe = self.redis.pipeline()
@@ -351,29 +428,7 @@ class OrderManager:
                 return False
             
             current_state = order_data["current_state"]
-            logger.info(f"Attempting transition {transition} from state {current_state} for order {order_id}")
-            
-            # Create state machine with model that has current state
-            model = OrderModel(order_id, current_state)
-            sm = OrderStateMachine(model)
-            
-            # Check if transition exists
-            if not hasattr(sm, transition):
-                pipe.unwatch()
-                logger.error(f"Transition {transition} not found")
-                return False
-            
-            # Execute transition
-            try:
-                transition_func = getattr(sm, transition)
-                transition_func()
-                new_state = sm.current_state.id
-            except (TransitionNotAllowed, AttributeError) as e:
-                pipe.unwatch()
-                logger.error(f"Transition {transition} failed: {e}")
-                return False
-                
-            timestamp = datetime.utcnow().isoformat()
+            logger.info(f"Attempting transitions {transitions} from state {current_state} for order {order_id}")
             
             # Parse current history
             try:
@@ -383,12 +438,34 @@ class OrderManager:
                 logger.error(f"Invalid history JSON for order {order_id}")
                 return False
             
-            # Add new history entry
-            current_history.append({
-                "state": new_state,
-                "timestamp": timestamp,
-                "notes": notes or f"Transitioned to {new_state}"
-            })
+            # Create state machine with model that has current state
+            model = OrderModel(order_id, current_state)
+            sm = OrderStateMachine(model)
+            timestamp = datetime.utcnow().isoformat()
+            
+            for transition in transitions:
+                # Check if transition exists
+                if not hasattr(sm, transition):
+                    pipe.unwatch()
+                    logger.error(f"Transition {transition} not found")
+                    return False
+                
+                # Execute transition
+                try:
+                    transition_func = getattr(sm, transition)
+                    transition_func()
+                    new_state = sm.current_state.id
+                except (TransitionNotAllowed, AttributeError) as e:
+                    pipe.unwatch()
+                    logger.error(f"Transition {transition} failed: {e}")
+                    return False
+                
+                # Add new history entry
+                current_history.append({
+                    "state": new_state,
+                    "timestamp": timestamp,
+                    "notes": notes or f"Transitioned to {new_state}"
+                })
             
             # Start transaction
             pipe.multi()
@@ -414,9 +491,10 @@ class OrderManager:
                 pass
             return False
     
-    def list_orders(self, limit: int = 50) -> List[OrderResponse]:
-        """List all orders with error handling"""
-        order_ids = list(self.redis.smembers("orders"))[:limit]
+    def list_orders(self, limit: int = 50, status: Union[str, List[str]] = None,
+                    customer_name: str = None, sort: str = None) -> List[OrderResponse]:
+        """List orders with error handling, optionally filtered by state(s) and customer"""
+        order_ids = self._matching_order_ids(status, customer_name, sort)[:limit]
         orders = []
         for order_id in order_ids:
             order = self.get_order(order_id)
@@ -424,6 +502,43 @@ class OrderManager:
                 orders.append(order)
         return orders
     
+    def count_orders_by_state(self) -> Dict[str, int]:
+        """Count orders per state, reading only each order's state in one pipelined round trip"""
+        pipe = self.redis.pipeline()
+        for order_id in self.redis.smembers("orders"):
+            pipe.hget(f"order:{order_id}", "current_state")
+        return dict(Counter(state for state in pipe.execute() if state))
+    
+    def iter_orders(self, status: str = None, customer_name: str = None) -> Iterator[OrderResponse]:
+        """Lazily yield matching orders one at a time"""
+        for order_id in self._matching_order_ids(status, customer_name):
+            order = self.get_order(order_id)
+            if order:
+                yield order
+    
+    def _matching_order_ids(self, status: Union[str, List[str]] = None, customer_name: str = None,
+                            sort: str = None) -> List[str]:
+        """Return ids of orders matching the optional state(s) and customer filters,
+        oldest first when sorted by created_at"""
+        order_ids = list(self.redis.smembers("orders"))
+        statuses = {status} if isinstance(status, str) else set(status or ())
+        
+        if statuses or customer_name or sort:
+            # Fetch only the filter and sort fields in one pipelined round trip
+            pipe = self.redis.pipeline()
+            for order_id in order_ids:
+                pipe.hmget(f"order:{order_id}", "current_state", "customer_name", "created_at")
+            fields = pipe.execute()
+            matches = [
+                (order_id, created_at) for order_id, (state, name, created_at) in zip(order_ids, fields)
+                if (not statuses or state in statuses) and (not customer_name or name == customer_name)
+            ]
+            if sort == "created_at":
+                matches.sort(key=lambda match: match[1] or "")
+            order_ids = [order_id for order_id, _ in matches]
+        
+        return order_ids
+    
     def get_available_transitions(self, order_id: str, role: Role) -> List[Dict]:
         """Get available transitions for an order based on current state and role"""
         order = self.get_order(order_id)
@@ -497,6 +612,36 @@ def create_order(order_data: OrderCreate, role: Role = Depends(get_role)):
         order.available_transitions = order_manager.get_available_transitions(order_id, role)
     return order
 
+@app.post("/orders/batch", response_model=List[Optional[OrderResponse]])
+def create_orders(orders_data: List[OrderCreate], role: Role = Depends(get_role)):
+    """Create several orders in one request; results are aligned with the request,
+    with null for any order that could not be read back"""
+    orders = []
+    for order_id in order_manager.create_orders(orders_data):
+        order = order_manager.get_order(order_id)
+        if order:
+            order.available_transitions = order_manager.get_available_transitions(order_id, role)
+        else:
+            logger.error(f"Created order {order_id} could not be read back")
+        orders.append(order)
+    return orders
+
+@app.get("/orders/stream")
+def stream_orders(status: Optional[str] = None, customer_name: Optional[str] = None,
+                  role: Role = Depends(get_role)):
+    """Stream matching orders as NDJSON, one order per line"""
+    def generate():
+        for order in order_manager.iter_orders(status=status, customer_name=customer_name):
+            order.available_transitions = order_manager.get_available_transitions(order.order_id, role)
+            yield order.model_dump_json() + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.get("/orders/counts", response_model=Dict[str, int])
+def count_orders(role: Role = Depends(get_role)):
+    """Number of orders in each state, for dashboards that do not need the orders themselves"""
+    return order_manager.count_orders_by_state()
+
 @app.get("/orders/{order_id}", response_model=OrderResponse)
 def get_order(order_id: str, role: Role = Depends(get_role)):
     """Get order by ID with available transitions"""
@@ -508,16 +653,29 @@ def get_order(order_id: str, role: Role = Depends(get_role)):
     return order
 
 @app.get("/orders", response_model=List[OrderResponse])
-def list_orders(limit: int = 50, role: Role = Depends(get_role)):
-    """List all orders with available transitions"""
-    orders = order_manager.list_orders(limit)
+def list_orders(limit: int = 50, status: Annotated[Optional[List[str]], Query()] = None,
+                customer_name: Optional[str] = None,
+                sort: Optional[str] = None, role: Role = Depends(get_role),
+                if_none_match: Annotated[Optional[str], Header()] = None):
+    """List orders with available transitions, optionally filtered by state(s) and customer.
+    Repeat the status parameter to match any of several states."""
+    if sort not in (None, "created_at"):
+        raise HTTPException(status_code=400, detail="Invalid sort. Must be 'created_at'")
+    
+    orders = order_manager.list_orders(limit, status=status, customer_name=customer_name, sort=sort)
     for order in orders:
         order.available_transitions = order_manager.get_available_transitions(order.order_id, role)
-    return orders
+    
+    # Conditional GET: pollers holding the current ETag get an empty 304
+    content = jsonable_encoder(orders)
+    body = json.dumps(content, separators=(",", ":"), sort_keys=True)
+    etag = f'"{hashlib.sha1(body.encode()).hexdigest()}"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=content, headers={"ETag": etag})
 
-@app.post("/orders/{order_id}/transition")
-def request_transition(order_id: str, request: TransitionRequest, role: Role = Depends(get_role)):
-    """Request a state transition for an order with proper validation"""
+def validate_transition_request(order_id: str, transition: str, role: Role) -> OrderResponse:
+    """Validate that an order exists and the role may perform the transition from its current state"""
     
     # Validate order exists
     order = order_manager.get_order(order_id)
@@ -525,10 +683,10 @@ def request_transition(order_id: str, request: TransitionRequest, role: Role = D
         raise HTTPException(status_code=404, detail="Order not found")
     
     # Check role permission BEFORE any other validation
-    if role not in TRANSITION_PERMISSIONS.get(request.transition, []):
+    if role not in TRANSITION_PERMISSIONS.get(transition, []):
         raise HTTPException(
             status_code=403, 
-            detail=f"Role '{role.value}' not allowed to perform transition '{request.transition}'"
+            detail=f"Role '{role.value}' not allowed to perform transition '{transition}'"
         )
     
     # Validate transition is available from current state
@@ -536,24 +694,31 @@ def request_transition(order_id: str, request: TransitionRequest, role: Role = D
     sm = OrderStateMachine(model)
     
     # Check if transition exists and can be executed
-    if not hasattr(sm, request.transition):
+    if not hasattr(sm, transition):
         raise HTTPException(
             status_code=400, 
-            detail=f"Transition '{request.transition}' not found"
+            detail=f"Transition '{transition}' not found"
         )
     
     # Try to validate transition can be executed (without actually executing it)
     try:
         test_model = OrderModel(order_id, order.current_state)
         test_sm = OrderStateMachine(test_model)
-        transition_func = getattr(test_sm, request.transition)
+        transition_func = getattr(test_sm, transition)
         transition_func()  # This will raise TransitionNotAllowed if invalid
     except Exception:
         raise HTTPException(
             status_code=400, 
-            detail=f"Transition '{request.transition}' not allowed from state '{order.current_state}'"
+            detail=f"Transition '{transition}' not allowed from state '{order.current_state}'"
         )
     
+    return order
+
+@app.post("/orders/{order_id}/transition")
+def request_transition(order_id: str, request: TransitionRequest, role: Role = Depends(get_role)):
+    """Request a state transition for an order with proper validation"""
+    validate_transition_request(order_id, request.transition, role)
+    
     # Enqueue the transition to role-specific queue
     task_id = task_queue.enqueue_transition(
         order_id=order_id,
@@ -571,10 +736,115 @@ def request_transition(order_id: str, request: TransitionRequest, role: Role = D
         "queue_position": queue_status.get(f"{role.value}_queued", 0)
     }
 
+def resolve_state_transition(order_id: str, transitions: Dict[str, str], action: str) -> str:
+    """Resolve the transition for a state-dependent action from the order's current state"""
+    order = order_manager.get_order(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    transition = transitions.get(order.current_state)
+    if not transition:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot {action} order in state '{order.current_state}'"
+        )
+    return transition
+
+@app.post("/orders/{order_id}/cancel")
+def cancel_order(order_id: str, request: Optional[OrderActionRequest] = None,
+                 role: Role = Depends(get_role)):
+    """Cancel an order (or return it once delivered), resolving the transition server-side"""
+    request = request or OrderActionRequest()
+    transition = resolve_state_transition(order_id, CANCEL_TRANSITIONS, "cancel")
+    return request_transition(
+        order_id,
+        TransitionRequest(transition=transition, notes=request.notes, agent_id=request.agent_id),
+        role
+    )
+
+@app.post("/orders/{order_id}/halt")
+def halt_order(order_id: str, request: Optional[OrderActionRequest] = None,
+               role: Role = Depends(get_role)):
+    """Halt an order (emergency stop), resolving the transition server-side"""
+    request = request or OrderActionRequest()
+    transition = resolve_state_transition(order_id, HALT_TRANSITIONS, "halt")
+    return request_transition(
+        order_id,
+        TransitionRequest(transition=transition, notes=request.notes, agent_id=request.agent_id),
+        role
+    )
+
+@app.post("/orders/{order_id}/advance-to")
+def advance_order(order_id: str, request: AdvanceRequest, role: Role = Depends(get_role)):
+    """Advance an order along the fulfillment chain to a target state in one atomic update"""
+    order = order_manager.get_order(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    chain_states = ["pending"] + [state for _, state in FORWARD_TRANSITIONS]
+    if request.target not in chain_states or order.current_state not in chain_states:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot advance order from '{order.current_state}' to '{request.target}'"
+        )
+    
+    start = chain_states.index(order.current_state)
+    end = chain_states.index(request.target)
+    if end <= start:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot advance order from '{order.current_state}' to '{request.target}'"
+        )
+    
+    transitions = [transition for transition, _ in FORWARD_TRANSITIONS[start:end]]
+    for transition in transitions:
+        if role not in TRANSITION_PERMISSIONS.get(transition, []):
+            raise HTTPException(
+                status_code=403,
+                detail=f"Role '{role.value}' not allowed to perform transition '{transition}'"
+            )
+    
+    success = order_manager.atomic_state_transitions(order_id, transitions, request.notes)
+    if not success:
+        raise HTTPException(status_code=400, detail="State transition failed")
+    
+    updated_order = order_manager.get_order(order_id)
+    
+    return {
+        "message": f"Order {order_id} advanced to '{request.target}'",
+        "order_id": order_id,
+        "transitions": transitions,
+        "new_state": updated_order.current_state if updated_order else "unknown"
+    }
+
+@app.post("/orders/{order_id}/execute")
+def execute_transition(order_id: str, request: TransitionRequest, role: Role = Depends(get_role)):
+    """Validate and execute a state transition immediately, bypassing the task queue"""
+    validate_transition_request(order_id, request.transition, role)
+    
+    # Execute atomic state transition
+    success = order_manager.atomic_state_transition(
+        order_id=order_id,
+        transition=request.transition,
+        notes=request.notes
+    )
+    
+    if not success:
+        raise HTTPException(status_code=400, detail="State transition failed")
+    
+    updated_order = order_manager.get_order(order_id)
+    
+    return {
+        "message": f"Transition '{request.transition}' executed for order {order_id}",
+        "order_id": order_id,
+        "transition": request.transition,
+        "new_state": updated_order.current_state if updated_order else "unknown"
+    }
+
 @app.post("/queue/claim")
-def claim_next_task(agent_id: str, role: Role = Depends(get_role)):
-    """Claim the next task from role-specific queue"""
-    task = task_queue.claim_next_task(agent_id, role)
+def claim_next_task(agent_id: str, wait: float = 0, role: Role = Depends(get_role)):
+    """Claim the next task from role-specific queue, long-polling up to `wait` seconds"""
+    task = task_queue.claim_next_task(agent_id, role, wait)
     if not task:
         return {"message": f"No {role.value} tasks available", "agent_id": agent_id}
     
@@ -602,6 +872,48 @@ def complete_task(task_id: str, agent_id: str, role: Role = Depends(get_role)):
     if task.task_id != task_id:
         raise HTTPException(status_code=400, detail="Task ID mismatch")
     
+    result = execute_claimed_task(task, agent_id, role)
+    if not result:
+        raise HTTPException(status_code=400, detail="State transition failed")
+    
+    return result
+
+@app.post("/queue/process")
+def process_next_task(agent_id: str, wait: float = 0, auto_advance: bool = False,
+                      role: Role = Depends(get_role)):
+    """Claim and complete the next task from role-specific queue in a single call.
+    With auto_advance, the next forward transition is queued in the same call."""
+    task = task_queue.claim_next_task(agent_id, role, wait)
+    if not task:
+        return {"message": f"No {role.value} tasks available", "agent_id": agent_id}
+    
+    result = execute_claimed_task(task, agent_id, role)
+    if not result:
+        return {"action": "task_failed", "task": task, "error": "State transition failed"}
+    
+    response = {"action": "task_completed", "task": task, "result": result}
+    if auto_advance:
+        response["next_task_id"] = enqueue_next_forward_transition(task.order_id, result["new_state"],
+                                                                   agent_id, role)
+    return response
+
+def enqueue_next_forward_transition(order_id: str, state: str, agent_id: str, role: Role) -> Optional[str]:
+    """Queue the happy-path transition following `state` if this role may perform it"""
+    next_transition = NEXT_FORWARD_TRANSITION.get(state)
+    if not next_transition or role not in TRANSITION_PERMISSIONS.get(next_transition, []):
+        return None
+    
+    return task_queue.enqueue_transition(
+        order_id=order_id,
+        transition=next_transition,
+        role=role,
+        agent_id=f"{agent_id}_auto",
+        notes=f"Auto-queued after reaching '{state}'"
+    )
+
+def execute_claimed_task(task: QueueTask, agent_id: str, role: Role) -> Optional[Dict]:
+    """Execute a claimed task's transition, completing it on success and releasing it on failure"""
+    
     # Execute atomic state transition
     success = order_manager.atomic_state_transition(
         order_id=task.order_id,
@@ -612,16 +924,16 @@ def complete_task(task_id: str, agent_id: str, role: Role = Depends(get_role)):
     if not success:
         # Release task back to queue on failure
         task_queue.release_task(agent_id, role, "Transition execution failed")
-        raise HTTPException(status_code=400, detail="State transition failed")
+        return None
     
     # Mark task as complete
-    task_queue.complete_task(agent_id, task_id)
+    task_queue.complete_task(agent_id, task.task_id)
     
     # Get updated order
     updated_order = order_manager.get_order(task.order_id)
     
     return {
-        "message": f"Task {task_id} completed successfully",
+        "message": f"Task {task.task_id} completed successfully",
         "order_id": task.order_id,
         "transition": task.transition,
         "new_state": updated_order.current_state if updated_order else "unknown"
@@ -641,8 +953,11 @@ def get_queue_status():
     return task_queue.get_queue_status()
 
 @app.get("/state-machine/info")
-def get_state_machine_info():
+def get_state_machine_info(response: Response):
     """Get state machine configuration"""
+    # The configuration is static for the lifetime of the process
+    response.headers["Cache-Control"] = "public, max-age=300"
+    
     temp_model = OrderModel("temp", "pending")
     temp_sm = OrderStateMachine(temp_model)
     
@@ -0,0 +1,3 @@
+def pytest_configure(config):
+    """Register custom markers used by the warehouse test suites"""
+    config.addinivalue_line("markers", "slow: long-running (polling/backoff) tests")
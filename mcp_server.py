@@ -248,6 +248,7 @@ async def handle_list_tools() -> List[types.Tool]:
                 "type": "object",
                 "properties": {
                     "state": {"type": "string", "description": "State to filter by", "enum": ["pending", "confirmed", "picking", "packed", "shipped", "delivered", "cancelled", "halted", "returned"]},
+                    "limit": {"type": "integer", "description": "Maximum number of orders to return, oldest first", "default": 50},
                     "agent_role": {"type": "string", "description": "Agent role: 'customer' or 'fulfillment'", "default": DEFAULT_AGENT_ROLE}
                 },
                 "required": ["state"]
@@ -405,7 +406,7 @@ async def handle_call_tool(name: str, arguments: dict) -> List[types.TextContent
         
         # Basic API Operations
         if name == "health_check":
-            result = client.health_check()
+            result = client.health_check(force=True)
             return [types.TextContent(type="text",
                 text=f"API Health: {result['status']}\nTimestamp: {format_timestamp(result['timestamp'])}")]
         
@@ -584,7 +585,8 @@ async def handle_call_tool(name: str, arguments: dict) -> List[types.TextContent
             return [types.TextContent(type="text", text="\n".join(lines))]
         
         elif name == "get_orders_by_state":
-            orders = client.get_orders_by_state(arguments["state"])
+            orders = client.get_orders_by_state(arguments["state"], limit=arguments.get("limit", 50),
+                                                sort="created_at")
             
             if not orders:
                 return [types.TextContent(type="text", text=f"No orders found in {arguments['state']} state")]
@@ -111,6 +111,24 @@ run_full_tests() {
     fi
 }
 
+# Function to run both test suites without slow (polling/backoff) tests
+run_fast_tests() {
+    echo "âš¡ Running fast test suite (skipping slow tests)..."
+    echo "--------------------------------------------------"
+    
+    python -m pytest test_warehouse_workflow.py test_warehouse_client.py -m "not slow" -v --tb=short --color=yes
+    
+    local test_exit_code=$?
+    
+    if [ $test_exit_code -eq 0 ]; then
+        echo "âœ… Fast tests passed!"
+        return 0
+    else
+        echo "âŒ Fast tests failed (exit code: $test_exit_code)"
+        return $test_exit_code
+    fi
+}
+
 # Function to run basic smoke tests
 run_smoke_tests() {
     echo "ðŸ’¨ Running smoke tests..."
@@ -190,6 +208,7 @@ show_usage() {
     echo "  client      - Client-based test suite only"
     echo "  integration - Core workflow tests (HTTP + client)"
     echo "  full        - Complete test suite (default)"
+    echo "  fast        - Both suites without slow (polling/backoff) tests"
     echo "  quick       - Same as smoke"
     echo ""
     echo "Examples:"
@@ -219,6 +238,9 @@ main() {
         "full")
             wait_for_api && run_full_tests
             ;;
+        "fast")
+            wait_for_api && run_fast_tests
+            ;;
         "help"|"-h"|"--help")
             show_usage
             exit 0
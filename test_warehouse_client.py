@@ -2,6 +2,7 @@ import pytest
 import time
 from typing import Dict, List, Optional
 from warehouse_client import create_customer_client, create_fulfillment_client, WarehouseClient
+from warehouse_expectations import EXPECTED_STATES, DELIVERED_HISTORY, DELIVERY_TRANSITIONS
 
 # Test Configuration
 BASE_URL = "http://warehouse-api:8000"  # Docker container networking
@@ -42,8 +43,7 @@ class TestClientBasicWorkflow:
         assert "role_permissions" in info
         
         # Verify expected states
-        expected_states = ["pending", "confirmed", "picking", "packed", "shipped", "delivered", "cancelled", "halted", "returned"]
-        for state in expected_states:
+        for state in EXPECTED_STATES:
             assert state in info["states"]
         
         # Verify role permissions exist
@@ -224,8 +224,7 @@ class TestClientBasicWorkflow:
         
         # Verify complete history
         states_in_history = [h["state"] for h in order["history"]]
-        expected_states = ["pending", "confirmed", "picking", "packed", "shipped", "delivered"]
-        assert states_in_history == expected_states
+        assert states_in_history == DELIVERED_HISTORY
         
         # Customer should now see return option
         transitions = [t["transition"] for t in order["available_transitions"]]
@@ -363,6 +362,80 @@ class TestClientListOrders:
         pending_orders = fulfillment_client.get_pending_orders()
         for order in pending_orders:
             assert order["current_state"] == "pending"
+    
+    def test_04_list_orders_with_server_filters(self, customer_client):
+        """Test combined server-side state and customer filters using client"""
+        order = customer_client.create_order("Filter Test Customer", ["Filter Item"])
+        
+        orders = customer_client.list_orders(status="pending", customer_name="Filter Test Customer")
+        assert order["order_id"] in [o["order_id"] for o in orders]
+        for o in orders:
+            assert o["current_state"] == "pending"
+            assert o["customer_name"] == "Filter Test Customer"
+    
+    def test_05_unchanged_list_is_not_modified(self, fulfillment_client):
+        """Test an unchanged order list is revalidated via ETag and reused"""
+        first = fulfillment_client.list_orders(status="delivered")
+        second = fulfillment_client.list_orders(status="delivered")
+        assert second == first
+        
+        # Each read is a fresh copy, so mutating one result does not leak into later reads
+        second.append({"order_id": "local-only"})
+        assert fulfillment_client.list_orders(status="delivered") == first
+    
+    def test_06_iter_orders_streams_matches(self, customer_client):
+        """Test streaming orders as NDJSON using client"""
+        order = customer_client.create_order("Stream Test Customer", ["Stream Item"])
+        
+        streamed = list(customer_client.iter_orders(customer_name="Stream Test Customer"))
+        assert order["order_id"] in [o["order_id"] for o in streamed]
+        for o in streamed:
+            assert o["customer_name"] == "Stream Test Customer"
+            assert "available_transitions" in o
+    
+    def test_07_get_oldest_pending_order(self, customer_client, fulfillment_client):
+        """Test server-side selection of the oldest pending order using client"""
+        customer_client.create_order("Oldest Test Customer", ["Oldest Item"])
+        
+        oldest = fulfillment_client.get_oldest_pending_order()
+        assert oldest is not None
+        assert oldest["current_state"] == "pending"
+        
+        pending = fulfillment_client.list_orders(limit=1000, status="pending")
+        assert oldest["created_at"] == min(o["created_at"] for o in pending)
+    
+    def test_08_list_orders_with_multiple_states(self, customer_client, fulfillment_client):
+        """Test filtering on several states in one request using client"""
+        pending = customer_client.create_order("Multi State Customer", ["Multi Item"])
+        confirmed = customer_client.create_order("Multi State Customer", ["Multi Item"])
+        fulfillment_client.request_and_complete(confirmed["order_id"], "confirm", "test_agent")
+        
+        orders = customer_client.list_orders(status=["pending", "confirmed"],
+                                             customer_name="Multi State Customer")
+        assert {pending["order_id"], confirmed["order_id"]} <= {o["order_id"] for o in orders}
+        for o in orders:
+            assert o["current_state"] in ("pending", "confirmed")
+    
+    def test_09_get_oldest_order_by_state(self, customer_client, fulfillment_client):
+        """Test server-side selection of the oldest order in any state using client"""
+        order = customer_client.create_order("Oldest State Customer", ["Oldest State Item"])
+        fulfillment_client.request_and_complete(order["order_id"], "confirm", "test_agent")
+        
+        oldest = fulfillment_client.get_oldest_order_by_state("confirmed")
+        assert oldest is not None
+        assert oldest["current_state"] == "confirmed"
+        
+        confirmed = fulfillment_client.list_orders(limit=1000, status="confirmed")
+        assert oldest["created_at"] == min(o["created_at"] for o in confirmed)
+    
+    def test_10_count_orders_by_state(self, customer_client):
+        """Test server-side per-state order counts using client"""
+        before = customer_client.count_orders_by_state()
+        customer_client.create_order("Count Customer", ["Count Item"])
+        after = customer_client.count_orders_by_state()
+        
+        assert after.get("pending", 0) == before.get("pending", 0) + 1
+        assert all(isinstance(n, int) for n in after.values())
 
 class TestClientConvenienceMethods:
     """Test client convenience methods and workflow helpers"""
@@ -421,6 +494,49 @@ class TestClientConvenienceMethods:
         assert customer_client.can_perform_transition(order_id, "confirm") is False
         assert fulfillment_client.can_perform_transition(order_id, "confirm") is True
         assert fulfillment_client.can_perform_transition(order_id, "cancel_from_pending") is False
+    
+    def test_04_batch_get_orders(self, customer_client):
+        """Test fetching several orders concurrently using client"""
+        order_ids = [
+            customer_client.create_order("Batch Test Customer", [f"Batch Item {i}"])["order_id"]
+            for i in range(3)
+        ]
+        
+        orders = customer_client.get_orders(order_ids)
+        
+        # Results come back in request order
+        assert [o["order_id"] for o in orders] == order_ids
+        assert all(o["current_state"] == "pending" for o in orders)
+        
+        # Per-item failures can be captured in place instead of aborting the batch
+        results = customer_client.get_orders(order_ids + ["nonexistent-order-id"], return_exceptions=True)
+        assert [o["order_id"] for o in results[:3]] == order_ids
+        assert isinstance(results[3], ValueError)
+    
+    def test_05_state_machine_info_is_cached(self, fulfillment_client):
+        """Test repeated state machine lookups are served from the client cache"""
+        first = fulfillment_client.get_state_machine_info()
+        assert fulfillment_client.get_state_machine_info() is first
+        
+        # Invalidation forces a fresh fetch
+        fulfillment_client.invalidate("/state-machine/info")
+        refreshed = fulfillment_client.get_state_machine_info()
+        assert refreshed is not first
+        assert refreshed == first
+    
+    def test_06_batch_create_orders(self, customer_client):
+        """Test creating several orders in one request using client"""
+        requests_ = [
+            {"customer_name": "Batch Create Customer", "items": [f"Batch Create Item {i}"], "notes": f"Batch {i}"}
+            for i in range(3)
+        ]
+        
+        orders = customer_client.create_orders(requests_)
+        
+        # Results come back in request order, each as a new pending order
+        assert [o["items"] for o in orders] == [r["items"] for r in requests_]
+        assert all(o["current_state"] == "pending" for o in orders)
+        assert len({o["order_id"] for o in orders}) == 3
 
 class TestClientWorkerMode:
     """Test client worker mode functionality"""
@@ -453,6 +569,7 @@ class TestClientWorkerMode:
             assert result["action"] == "task_completed"
             assert result["task"]["transition"] == "confirm"
     
+    @pytest.mark.slow
     def test_02_worker_with_no_tasks(self, fulfillment_client):
         """Test worker mode when no tasks are available"""
         # Run worker with max_tasks=1 on empty queue
@@ -464,6 +581,23 @@ class TestClientWorkerMode:
         
         # Should return empty list since no tasks were available
         assert len(results) == 0
+    
+    def test_03_process_with_auto_advance(self, fulfillment_client, customer_client):
+        """Test processing a task also queues the next happy-path transition"""
+        order = customer_client.create_order("Auto Advance Customer", ["Auto Advance Item"])
+        fulfillment_client.confirm_order(order["order_id"], "Confirming for auto-advance")
+        
+        result = fulfillment_client.process_next_task("auto-advance-worker", auto_advance=True)
+        assert result["action"] == "task_completed"
+        assert result["result"]["new_state"] == "confirmed"
+        assert result["next_task_id"] is not None
+        
+        # The follow-up task is already waiting in the queue
+        result = fulfillment_client.process_next_task("auto-advance-worker")
+        assert result["task"]["order_id"] == order["order_id"]
+        assert result["task"]["transition"] == "start_picking"
+        assert result["result"]["new_state"] == "picking"
+        assert "next_task_id" not in result
 
 class TestClientAdvancedWorkflows:
     """Test advanced workflow scenarios using client"""
@@ -479,9 +613,10 @@ class TestClientAdvancedWorkflows:
         order_id = order["order_id"]
         
         # Confirm the order
-        fulfillment_client.confirm_order(order_id, "Confirming for halt test")
-        task_result = fulfillment_client.process_next_task("halt-agent")
-        assert task_result["result"]["new_state"] == "confirmed"
+        result = fulfillment_client.request_and_complete(
+            order_id, "confirm", "halt-agent", notes="Confirming for halt test"
+        )
+        assert result["new_state"] == "confirmed"
         
         # Halt the order
         halt_result = fulfillment_client.halt_order(order_id, "Emergency halt for testing")
@@ -510,13 +645,12 @@ class TestClientAdvancedWorkflows:
         order_id = order["order_id"]
         
         # Process through to delivered (simulate full workflow)
-        transitions = ["confirm", "start_picking", "pack", "ship", "deliver"]
         agent_id = "return-test-agent"
         
-        for transition in transitions:
-            fulfillment_client.request_transition(order_id, transition, notes=f"Processing {transition}")
-            task_result = fulfillment_client.process_next_task(agent_id)
-            assert task_result["action"] == "task_completed"
+        for transition in DELIVERY_TRANSITIONS:
+            fulfillment_client.request_and_complete(
+                order_id, transition, agent_id, notes=f"Processing {transition}"
+            )
         
         # Verify order is delivered
         final_order = customer_client.get_order(order_id)
@@ -529,6 +663,33 @@ class TestClientAdvancedWorkflows:
         # Process return task
         task_result = customer_client.process_next_task("return-customer")
         assert task_result["result"]["new_state"] == "returned"
+    
+    def test_03_halt_order_resolves_transition(self, fulfillment_client, customer_client):
+        """Test halt_order lets the server pick the halt transition for the current state"""
+        order = customer_client.create_order("Halt Shortcut Customer", ["Halt Shortcut Item"])
+        
+        result = fulfillment_client.halt_order(order["order_id"], "Halting pending order")
+        assert "task_id" in result
+        assert "halt_from_pending" in result["message"]
+    
+    def test_04_advance_to_delivered(self, fulfillment_client, customer_client):
+        """Test advancing an order through the whole fulfillment chain in one call"""
+        order = customer_client.create_order("Advance Test Customer", ["Advance Item"])
+        
+        result = fulfillment_client.advance_to(order["order_id"], "delivered", notes="Bulk fulfillment")
+        assert result["new_state"] == "delivered"
+        assert result["transitions"] == list(DELIVERY_TRANSITIONS)
+        
+        history = [h["state"] for h in customer_client.get_order(order["order_id"])["history"]]
+        assert history == DELIVERED_HISTORY
+    
+    def test_05_advance_to_rejects_backwards(self, fulfillment_client, customer_client):
+        """Test advance_to refuses targets behind the current state"""
+        order = customer_client.create_order("Advance Back Customer", ["Advance Item"])
+        fulfillment_client.advance_to(order["order_id"], "packed")
+        
+        with pytest.raises(ValueError):
+            fulfillment_client.advance_to(order["order_id"], "confirmed")
 
 if __name__ == "__main__":
     # Run tests when executed directly
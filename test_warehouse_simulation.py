@@ -0,0 +1,43 @@
+import pytest
+from types import SimpleNamespace
+
+pytest.importorskip("mesa")
+pytest.importorskip("solara")
+
+from warehouse_simulation import EnhancedFulfillmentAgent, WorkInProgress
+
+def _fulfillment_agent(work_in_progress):
+    """A stand-in fulfillment agent whose every roll would trigger an equipment failure"""
+    failures = []
+    agent = SimpleNamespace(
+        name="Fulfillment_test",
+        agent_id="fulfillment-test",
+        work_in_progress=work_in_progress,
+        check_interval=1,
+        model=SimpleNamespace(config=SimpleNamespace(
+            enable_operational_disruptions=True,
+            equipment_failure_probability=1.0,
+            fulfillment_check_interval=1,
+        )),
+        _uniforms=SimpleNamespace(next=lambda: 0.0),
+        client=SimpleNamespace(process_next_task=lambda agent_id: {"message": "No fulfillment tasks available"}),
+    )
+    agent._equipment_failure = lambda: failures.append(True)
+    return agent, failures
+
+class TestFulfillmentAgentDisruptions:
+    """Test operational disruptions never stall claimed work"""
+    
+    def test_01_equipment_fails_between_tasks(self):
+        """Test an idle agent can suffer an equipment failure"""
+        agent, failures = _fulfillment_agent({})
+        EnhancedFulfillmentAgent._process_next_task(agent)
+        assert failures == [True]
+    
+    def test_02_no_equipment_failure_while_working(self):
+        """Test an agent with work in progress skips the equipment failure roll"""
+        work = WorkInProgress("order-1", "pack", "packed", 5.0, 3, None)
+        agent, failures = _fulfillment_agent({"task-1": work})
+        EnhancedFulfillmentAgent._process_next_task(agent)
+        assert failures == []
+        assert agent.work_in_progress == {"task-1": work}
@@ -2,6 +2,7 @@ import pytest
 import time
 from typing import Dict, List, Optional
 from warehouse_client import create_customer_client, create_fulfillment_client, WarehouseClient
+from warehouse_expectations import EXPECTED_STATES, DELIVERED_HISTORY, DELIVERY_TRANSITIONS
 
 # Test Configuration
 BASE_URL = "http://warehouse-api:8000"  # Docker container networking
@@ -42,8 +43,7 @@ class TestClientBasicWorkflow:
         assert "role_permissions" in info
         
         # Verify expected states
-        expected_states = ["pending", "confirmed", "picking", "packed", "shipped", "delivered", "cancelled", "halted", "returned"]
-        for state in expected_states:
+        for state in EXPECTED_STATES:
             assert state in info["states"]
         
         # Verify role permissions exist
@@ -224,8 +224,7 @@ class TestClientBasicWorkflow:
         
         # Verify complete history
         states_in_history = [h["state"] for h in order["history"]]
-        expected_states = ["pending", "confirmed", "picking", "packed", "shipped", "delivered"]
-        assert states_in_history == expected_states
+        assert states_in_history == DELIVERED_HISTORY
         
         # Customer should now see return option
         transitions = [t["transition"] for t in order["available_transitions"]]
@@ -487,6 +486,7 @@ class TestClientWorkerMode:
             if result.get("action") == "task_completed":
                 assert result["task"]["transition"] == "confirm"
     
+    @pytest.mark.slow
     def test_02_worker_with_no_tasks(self, fulfillment_client):
         """Test worker mode when no tasks are available"""
         # Run worker with max_tasks=1 on empty queue
@@ -513,30 +513,26 @@ class TestClientAdvancedWorkflows:
         order_id = order["order_id"]
         
         # Confirm the order
-        fulfillment_client.confirm_order(order_id, "Confirming for halt test")
+        result = fulfillment_client.request_and_complete(
+            order_id, "confirm", "halt-agent", notes="Confirming for halt test"
+        )
+        assert result["new_state"] == "confirmed"
+        
+        # Halt the order
+        halt_result = fulfillment_client.halt_order(order_id, "Emergency halt for testing")
+        assert "task_id" in halt_result
+        
+        # Process halt task
         task_result = fulfillment_client.process_next_task("halt-agent")
+        assert task_result["result"]["new_state"] == "halted"
         
-        # Only proceed if task was successfully processed
-        if task_result.get("action") == "task_completed":
-            assert task_result["result"]["new_state"] == "confirmed"
-            
-            # Only test halt/resume if we have the methods available
-            if hasattr(fulfillment_client, 'halt_order') and hasattr(fulfillment_client, 'resume_order'):
-                # Halt the order
-                halt_result = fulfillment_client.halt_order(order_id, "Emergency halt for testing")
-                assert "task_id" in halt_result
-                
-                # Process halt task
-                task_result = fulfillment_client.process_next_task("halt-agent")
-                assert task_result["result"]["new_state"] == "halted"
-                
-                # Resume to confirmed state
-                resume_result = fulfillment_client.resume_order(order_id, "confirmed", "Resuming after halt")
-                assert "task_id" in resume_result
-                
-                # Process resume task
-                task_result = fulfillment_client.process_next_task("halt-agent")
-                assert task_result["result"]["new_state"] == "confirmed"
+        # Resume to confirmed state
+        resume_result = fulfillment_client.resume_order(order_id, "confirmed", "Resuming after halt")
+        assert "task_id" in resume_result
+        
+        # Process resume task
+        task_result = fulfillment_client.process_next_task("halt-agent")
+        assert task_result["result"]["new_state"] == "confirmed"
     
     def test_02_return_delivered_order(self, fulfillment_client, customer_client):
         """Test returning a delivered order using client"""
@@ -549,14 +545,13 @@ class TestClientAdvancedWorkflows:
         order_id = order["order_id"]
         
         # Process through to delivered (simulate full workflow)
-        transitions = ["confirm", "start_picking", "pack", "ship", "deliver"]
         agent_id = "return-test-agent"
         
         try:
-            for transition in transitions:
-                fulfillment_client.request_transition(order_id, transition, notes=f"Processing {transition}")
-                task_result = fulfillment_client.process_next_task(agent_id)
-                assert task_result["action"] == "task_completed"
+            for transition in DELIVERY_TRANSITIONS:
+                fulfillment_client.request_and_complete(
+                    order_id, transition, agent_id, notes=f"Processing {transition}"
+                )
             
             # Verify order is delivered
             final_order = customer_client.get_order(order_id)
@@ -1,9 +1,87 @@
 import requests
-import json
-from typing import List, Dict, Optional, Any
-from datetime import datetime
+from typing import List, Dict, Optional, Any, Iterator, Callable, Union
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
+import random
 import time
+import threading
+from collections import OrderedDict
+from types import MappingProxyType
+
+# orjson is optional; fall back to the standard library codec
+try:
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    import json
+    from json import loads as _json_loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+# Retry policy: only idempotent requests are retried, and only on transient failures
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+RETRY_BACKOFF_BASE = 0.1   # seconds
+RETRY_BACKOFF_CAP = 30.0   # seconds
+
+# Default lifetime of cached static responses when the server sends no max-age
+DEFAULT_CACHE_TTL = 60.0   # seconds
+
+# Most recent (endpoint, params) combinations kept for conditional GETs
+ETAG_CACHE_SIZE = 128
+
+# Upper bound on concurrent in-flight requests for batch helpers
+DEFAULT_BATCH_WORKERS = 10
+
+# Healthy /health responses are reused per base_url for this long
+HEALTH_CACHE_TTL = 600.0   # seconds
+_health_cache: Dict[str, tuple] = {}
+
+# State -> transition lookup tables used by the convenience methods (read-only)
+CANCEL_TRANSITIONS = MappingProxyType({
+    'pending': 'cancel_from_pending',
+    'confirmed': 'cancel_from_confirmed',
+    'picking': 'cancel_from_picking',
+    'packed': 'cancel_from_packed'
+})
+HALT_TRANSITIONS = MappingProxyType({
+    'pending': 'halt_from_pending',
+    'confirmed': 'halt_from_confirmed',
+    'picking': 'halt_from_picking',
+    'packed': 'halt_from_packed'
+})
+RESUME_TRANSITIONS = MappingProxyType({
+    'pending': 'resume_to_pending',
+    'confirmed': 'resume_to_confirmed',
+    'picking': 'resume_to_picking',
+    'packed': 'resume_to_packed'
+})
+
+def create_session(pool_connections: int = 32, pool_maxsize: int = 128) -> requests.Session:
+    """
+    Create a pooled keep-alive session that several clients (of any role) can share.
+    Role headers are sent per request, so the session carries only common headers.
+    """
+    session = requests.Session()
+    
+    # Keep connections to the API alive and reuse them across requests.
+    # Retries are handled in WarehouseClient._send, so urllib3's own retries are disabled.
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                          pool_block=False, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    
+    session.headers.update({
+        'Content-Type': 'application/json',
+        'Connection': 'keep-alive',
+        'Accept-Encoding': 'gzip, deflate',
+    })
+    return session
+
+def _without_none(**fields) -> Dict[str, Any]:
+    """Build a request payload, omitting fields left as None so server defaults apply."""
+    return {k: v for k, v in fields.items() if v is not None}
 
 class WarehouseClient:
     """
@@ -11,70 +89,204 @@ class WarehouseClient:
     Supports 'customer' and 'fulfillment' agent roles via X-AGENT-ROLE header.
     """
     
-    def __init__(self, base_url: str = "http://localhost:8000", role: str = "customer"):
+    __slots__ = ('base_url', 'role', 'timeout', 'max_retries', 'session', 'logger',
+                 '_role_headers', '_cache', '_etag_cache', '_etag_lock')
+    
+    def __init__(self, base_url: str = "http://localhost:8000", role: str = "customer",
+                 timeout: float = 10.0, max_retries: int = 3,
+                 pool_connections: int = 32, pool_maxsize: int = 128,
+                 session: requests.Session = None):
         """
         Initialize warehouse client.
         
         Args:
             base_url: Base URL of the warehouse API
             role: Agent role - 'customer' or 'fulfillment'
+            timeout: Default per-request timeout in seconds
+            max_retries: Retries for idempotent requests on transient failures
+            pool_connections: Number of per-host connection pools to keep
+            pool_maxsize: Maximum kept-alive connections per pool (size for worker fan-out)
+            session: Shared session from create_session(); pool arguments are then ignored
         """
         self.base_url = base_url.rstrip('/')
         self.role = role
-        self.session = requests.Session()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = session or create_session(pool_connections, pool_maxsize)
         
-        # Set default headers including role
-        self.session.headers.update({
-            'Content-Type': 'application/json',
-            'X-AGENT-ROLE': role
-        })
+        # Role header is sent with each request so sessions can be shared across roles
+        self._role_headers = {'X-AGENT-ROLE': role}
         
         self.logger = logging.getLogger(f"warehouse_client_{role}")
+        
+        # endpoint -> (expires_at, parsed body) for static GET responses
+        self._cache: Dict[str, tuple] = {}
+        # (endpoint, params) -> (etag, raw body) for conditional GETs, least recently used first
+        self._etag_cache: OrderedDict = OrderedDict()
+        # Clients are shared across agent threads, so the LRU bookkeeping is serialized
+        self._etag_lock = threading.Lock()
+    
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request, retrying transient failures with full-jitter exponential backoff.
+        Non-idempotent requests are only retried when they carry an Idempotency-Key header.
+        """
+        headers = kwargs.get("headers") or {}
+        retryable = method.upper() in IDEMPOTENT_METHODS or "Idempotency-Key" in headers
+        attempts = self.max_retries + 1 if retryable else 1
+        
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = self.session.request(method, url, **kwargs)
+                if response.status_code not in RETRYABLE_STATUS_CODES or last_attempt:
+                    return response
+                reason = f"HTTP {response.status_code}"
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if last_attempt:
+                    raise
+                reason = str(e)
+            
+            delay = random.uniform(0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * (2 ** attempt)))
+            self.logger.warning(f"{method} {url} failed ({reason}), retrying in {delay:.2f}s")
+            time.sleep(delay)
+    
+    @staticmethod
+    def _decode(response: requests.Response) -> Any:
+        """Parse a JSON response body (orjson when installed); empty bodies decode to {}."""
+        return _json_loads(response.content) if response.content else {}
     
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make HTTP request with error handling."""
+        response = self._request(method, endpoint, **kwargs)
+        
+        return self._decode(response)
+    
+    def _request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        """Make HTTP request and map error responses to exceptions."""
         url = f"{self.base_url}{endpoint}"
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs["headers"] = {**self._role_headers, **(kwargs.get("headers") or {})}
+        if "json" in kwargs:
+            # Encode bodies ourselves so orjson (when installed) does the work
+            kwargs["data"] = _json_dumps(kwargs.pop("json"))
+            kwargs["headers"].setdefault("Content-Type", "application/json")
         
         try:
-            response = self.session.request(method, url, **kwargs)
+            response = self._send(method, url, **kwargs)
             
             # Handle business logic errors with helpful messages
             if response.status_code == 400:
-                error_data = response.json() if response.content else {}
+                error_data = self._decode(response)
                 error_detail = error_data.get("detail", "Bad request")
                 raise ValueError(error_detail)
             
             elif response.status_code == 403:
-                error_data = response.json() if response.content else {}
+                error_data = self._decode(response)
                 error_detail = error_data.get("detail", "Access denied")
                 raise PermissionError(f"Role '{self.role}' access denied: {error_detail}")
             
             elif response.status_code == 404:
-                error_data = response.json() if response.content else {}
+                error_data = self._decode(response)
                 error_detail = error_data.get("detail", "Not found")
                 raise ValueError(error_detail)
             
             response.raise_for_status()
-            
-            if response.content:
-                return response.json()
-            return {}
+            return response
             
         except requests.exceptions.RequestException as e:
             self.logger.error(f"{method} {url} failed: {e}")
             raise
     
+    def _cached_get(self, endpoint: str, ttl: float = DEFAULT_CACHE_TTL) -> Dict[str, Any]:
+        """GET a static resource, serving it from the in-process cache until it expires."""
+        now = time.monotonic()
+        cached = self._cache.get(endpoint)
+        if cached and cached[0] > now:
+            return cached[1]
+        
+        response = self._request("GET", endpoint)
+        body = self._decode(response)
+        
+        # Honour the server's max-age if it sent one
+        cache_control = response.headers.get("Cache-Control", "")
+        for directive in cache_control.split(","):
+            name, _, value = directive.strip().partition("=")
+            if name == "max-age" and value.isdigit():
+                ttl = float(value)
+            elif name in ("no-store", "no-cache"):
+                ttl = 0
+        
+        if ttl > 0:
+            self._cache[endpoint] = (now + ttl, body)
+        return body
+    
+    def _conditional_get(self, endpoint: str, params: Dict = None) -> Any:
+        """
+        GET with If-None-Match, re-parsing the previously cached body on 304 Not Modified.
+        Every call returns a freshly parsed object, so callers may mutate the result.
+        """
+        key = (endpoint, tuple(sorted((k, v) for k, v in (params or {}).items() if v is not None)))
+        with self._etag_lock:
+            cached = self._etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else None
+        
+        response = self._request("GET", endpoint, params=params, headers=headers)
+        if response.status_code == 304:
+            if cached:
+                with self._etag_lock:
+                    if key in self._etag_cache:  # Not invalidated while the request was in flight
+                        self._etag_cache.move_to_end(key)
+                return _json_loads(cached[1])
+            # Nothing cached to revalidate against: fetch the full body unconditionally
+            response = self._request("GET", endpoint, params=params,
+                                     headers={"Cache-Control": "no-cache"})
+        
+        etag = response.headers.get("ETag")
+        if etag and response.content:
+            with self._etag_lock:
+                self._etag_cache.pop(key, None)
+                self._etag_cache[key] = (etag, response.content)
+                while len(self._etag_cache) > ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+        return self._decode(response)
+    
+    def invalidate(self, endpoint: str = None):
+        """Drop a cached response, or the whole cache when no endpoint is given."""
+        if endpoint is None:
+            self._cache.clear()
+            with self._etag_lock:
+                self._etag_cache.clear()
+        else:
+            self._cache.pop(endpoint, None)
+            with self._etag_lock:
+                for key in [k for k in self._etag_cache if k[0] == endpoint]:
+                    del self._etag_cache[key]
+    
     # ============================================================================
     # BASIC API OPERATIONS
     # ============================================================================
     
-    def health_check(self) -> Dict:
-        """Check API health status."""
-        return self._make_request("GET", "/health")
+    def health_check(self, force: bool = False) -> Dict:
+        """
+        Check API health status.
+        A healthy result is shared by all clients of the same base_url for HEALTH_CACHE_TTL;
+        pass force=True to always ask the server (e.g. while waiting for it to come up).
+        """
+        cached = _health_cache.get(self.base_url)
+        if not force and cached and time.monotonic() < cached[0]:
+            return cached[1]
+        
+        result = self._make_request("GET", "/health")
+        if result.get("status") == "healthy":
+            _health_cache[self.base_url] = (time.monotonic() + HEALTH_CACHE_TTL, result)
+        else:
+            _health_cache.pop(self.base_url, None)
+        return result
     
     def get_state_machine_info(self) -> Dict:
-        """Get state machine configuration and role permissions."""
-        return self._make_request("GET", "/state-machine/info")
+        """Get state machine configuration and role permissions (cached)."""
+        return self._cached_get("/state-machine/info")
     
     # ============================================================================
     # ORDER OPERATIONS
@@ -82,21 +294,64 @@ class WarehouseClient:
     
     def create_order(self, customer_name: str, items: List[str], notes: str = None) -> Dict:
         """Create a new order."""
-        data = {
-            "customer_name": customer_name,
-            "items": items,
-            "notes": notes
-        }
+        data = _without_none(customer_name=customer_name, items=items, notes=notes)
         return self._make_request("POST", "/orders", json=data)
     
+    def create_orders(self, orders: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Create several orders in one request.
+        Each entry takes the create_order fields (customer_name, items, optional notes);
+        results come back in the same order, with None for any order that failed.
+        """
+        data = [_without_none(customer_name=o["customer_name"], items=o["items"], notes=o.get("notes"))
+                for o in orders]
+        result = self._post_shortcut("/orders/batch", data)
+        if result is not None:
+            return result
+        
+        # Older servers: one request per order, keeping the ones created before a failure
+        results = []
+        for o in orders:
+            try:
+                results.append(self.create_order(o["customer_name"], o["items"], o.get("notes")))
+            except (requests.exceptions.RequestException, ValueError, PermissionError) as e:
+                self.logger.error(f"Creating order for {o['customer_name']} failed: {e}")
+                results.append(None)
+        return results
+    
     def get_order(self, order_id: str) -> Dict:
         """Get order details with available transitions for current role."""
         return self._make_request("GET", f"/orders/{order_id}")
     
-    def list_orders(self, limit: int = 50) -> List[Dict]:
-        """List orders with available transitions for current role."""
-        params = {"limit": limit}
-        return self._make_request("GET", "/orders", params=params)
+    def list_orders(self, limit: int = 50, status: Union[str, List[str]] = None,
+                    customer_name: str = None, sort: str = None) -> List[Dict]:
+        """
+        List orders with available transitions for current role, filtered server-side.
+        Pass a list of states to match orders in any of them with one request.
+        """
+        if status is not None and not isinstance(status, str):
+            status = tuple(status)
+        params = {"limit": limit, "status": status, "customer_name": customer_name, "sort": sort}
+        return self._conditional_get("/orders", params=params)
+    
+    def count_orders_by_state(self) -> Optional[Dict[str, int]]:
+        """Count all orders per state in one small request; returns None if the server predates it."""
+        try:
+            return self._make_request("GET", "/orders/counts")
+        except ValueError as e:
+            # Older servers route /orders/counts to GET /orders/{order_id}
+            if str(e) == "Order not found":
+                return None
+            raise
+    
+    def iter_orders(self, status: str = None, customer_name: str = None) -> Iterator[Dict]:
+        """Stream matching orders one at a time without buffering the whole list."""
+        params = {"status": status, "customer_name": customer_name}
+        response = self._request("GET", "/orders/stream", params=params, stream=True)
+        with response:
+            for line in response.iter_lines():
+                if line:
+                    yield _json_loads(line)
     
     # ============================================================================
     # STATE TRANSITION OPERATIONS
@@ -105,21 +360,70 @@ class WarehouseClient:
     def request_transition(self, order_id: str, transition: str, 
                           notes: str = None, agent_id: str = None) -> Dict:
         """Request a state transition for an order."""
-        data = {
-            "transition": transition,
-            "notes": notes,
-            "agent_id": agent_id
-        }
+        data = _without_none(transition=transition, notes=notes, agent_id=agent_id)
         return self._make_request("POST", f"/orders/{order_id}/transition", json=data)
     
+    def request_and_complete(self, order_id: str, transition: str, agent_id: str,
+                             notes: str = None) -> Dict:
+        """
+        Request and execute a state transition in a single call.
+        The server validates and applies the transition without queueing a task.
+        """
+        data = _without_none(transition=transition, notes=notes, agent_id=agent_id)
+        return self._make_request("POST", f"/orders/{order_id}/execute", json=data)
+    
+    # ============================================================================
+    # BATCH OPERATIONS
+    # ============================================================================
+    
+    def _run_batch(self, call: Callable[[str], Dict], order_ids: List[str],
+                   max_workers: int, return_exceptions: bool) -> List[Any]:
+        """
+        Run call(order_id) for each id with at most max_workers requests in flight.
+        Results keep the order of order_ids; failures are logged as they complete and,
+        with return_exceptions, returned in place instead of raised.
+        """
+        if not order_ids:
+            return []
+        
+        results: List[Any] = [None] * len(order_ids)
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(order_ids)))) as executor:
+            futures = {executor.submit(call, order_id): i for i, order_id in enumerate(order_ids)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    self.logger.error(f"Batch call for order {order_ids[i]} failed: {e}")
+                    if not return_exceptions:
+                        executor.shutdown(wait=False, cancel_futures=True)
+                        raise
+                    results[i] = e
+        return results
+    
+    def get_orders(self, order_ids: List[str], max_workers: int = DEFAULT_BATCH_WORKERS,
+                   return_exceptions: bool = False) -> List[Any]:
+        """Fetch several orders concurrently, returned in the same order as order_ids."""
+        return self._run_batch(self.get_order, order_ids, max_workers, return_exceptions)
+    
+    def request_transitions(self, order_ids: List[str], transition: str, notes: str = None,
+                            agent_id: str = None, max_workers: int = DEFAULT_BATCH_WORKERS,
+                            return_exceptions: bool = False) -> List[Any]:
+        """Request the same transition for several orders concurrently."""
+        return self._run_batch(
+            lambda order_id: self.request_transition(order_id, transition, notes, agent_id),
+            order_ids, max_workers, return_exceptions
+        )
+    
     # ============================================================================
     # QUEUE MANAGEMENT OPERATIONS
     # ============================================================================
     
-    def claim_next_task(self, agent_id: str) -> Dict:
-        """Claim the next task from role-specific queue."""
-        params = {"agent_id": agent_id}
-        return self._make_request("POST", "/queue/claim", params=params)
+    def claim_next_task(self, agent_id: str, wait: float = 0) -> Dict:
+        """Claim the next task from role-specific queue, long-polling up to `wait` seconds."""
+        params = {"agent_id": agent_id, "wait": wait or None}
+        return self._make_request("POST", "/queue/claim", params=params,
+                                  timeout=self.timeout + wait)
     
     def complete_task(self, task_id: str, agent_id: str) -> Dict:
         """Complete a claimed task."""
@@ -139,24 +443,36 @@ class WarehouseClient:
     # CONVENIENCE METHODS FOR CUSTOMERS
     # ============================================================================
     
+    def _post_shortcut(self, endpoint: str, data: Any) -> Optional[Any]:
+        """POST to a server-side shortcut endpoint; returns None if the server predates it."""
+        try:
+            return self._make_request("POST", endpoint, json=data)
+        except ValueError as e:
+            # FastAPI's generic 404 for unknown routes; 'Order not found' is a real error
+            if str(e) == "Not Found":
+                return None
+            raise
+        except requests.exceptions.HTTPError as e:
+            # A path that only matches a GET route (e.g. /orders/{order_id}) answers 405
+            if e.response is not None and e.response.status_code == 405:
+                return None
+            raise
+    
     def cancel_order(self, order_id: str, reason: str = "Customer cancellation") -> Dict:
         """
         Cancel an order by requesting appropriate cancellation transition.
-        Will determine the correct transition based on current state.
+        The server resolves the transition from the current state in one call.
         """
+        result = self._post_shortcut(f"/orders/{order_id}/cancel", _without_none(notes=reason))
+        if result is not None:
+            return result
+        
+        # Older servers: look up the state and pick the transition client-side
         order = self.get_order(order_id)
         current_state = order['current_state']
         
-        # Map states to cancellation transitions
-        cancel_transitions = {
-            'pending': 'cancel_from_pending',
-            'confirmed': 'cancel_from_confirmed',
-            'picking': 'cancel_from_picking',
-            'packed': 'cancel_from_packed'
-        }
-        
-        if current_state in cancel_transitions:
-            transition = cancel_transitions[current_state]
+        if current_state in CANCEL_TRANSITIONS:
+            transition = CANCEL_TRANSITIONS[current_state]
             return self.request_transition(order_id, transition, notes=reason)
         elif current_state == 'delivered':
             return self.request_transition(order_id, 'return_order', notes=reason)
@@ -168,9 +484,8 @@ class WarehouseClient:
         return self.request_transition(order_id, 'return_order', notes=reason)
     
     def get_my_orders(self, customer_name: str) -> List[Dict]:
-        """Get orders for a specific customer (filter by customer_name)."""
-        all_orders = self.list_orders()
-        return [order for order in all_orders if order.get('customer_name') == customer_name]
+        """Get orders for a specific customer (filtered server-side by customer_name)."""
+        return self.list_orders(customer_name=customer_name)
     
     # ============================================================================
     # CONVENIENCE METHODS FOR FULFILLMENT
@@ -196,58 +511,79 @@ class WarehouseClient:
         """Mark order as delivered."""
         return self.request_transition(order_id, 'deliver', notes=notes)
     
+    def advance_to(self, order_id: str, target_state: str, notes: str = None) -> Dict:
+        """
+        Advance an order along the fulfillment chain to target_state in one call.
+        The server applies every intermediate transition atomically.
+        """
+        data = _without_none(target=target_state, notes=notes)
+        return self._make_request("POST", f"/orders/{order_id}/advance-to", json=data)
+    
     def halt_order(self, order_id: str, reason: str = None) -> Dict:
         """Halt an order (emergency stop)."""
+        result = self._post_shortcut(f"/orders/{order_id}/halt", _without_none(notes=reason))
+        if result is not None:
+            return result
+        
+        # Older servers: look up the state and pick the transition client-side
         order = self.get_order(order_id)
         current_state = order['current_state']
         
-        halt_transitions = {
-            'pending': 'halt_from_pending',
-            'confirmed': 'halt_from_confirmed',
-            'picking': 'halt_from_picking',
-            'packed': 'halt_from_packed'
-        }
-        
-        if current_state in halt_transitions:
-            transition = halt_transitions[current_state]
+        if current_state in HALT_TRANSITIONS:
+            transition = HALT_TRANSITIONS[current_state]
             return self.request_transition(order_id, transition, notes=reason)
         else:
             raise ValueError(f"Cannot halt order in state '{current_state}'")
     
     def resume_order(self, order_id: str, target_state: str, notes: str = None) -> Dict:
         """Resume a halted order to a specific state."""
-        resume_transitions = {
-            'pending': 'resume_to_pending',
-            'confirmed': 'resume_to_confirmed',
-            'picking': 'resume_to_picking',
-            'packed': 'resume_to_packed'
-        }
-        
-        if target_state in resume_transitions:
-            transition = resume_transitions[target_state]
+        if target_state in RESUME_TRANSITIONS:
+            transition = RESUME_TRANSITIONS[target_state]
             return self.request_transition(order_id, transition, notes=notes)
         else:
             raise ValueError(f"Cannot resume to state '{target_state}'")
     
     def get_pending_orders(self) -> List[Dict]:
         """Get all orders in pending state."""
-        all_orders = self.list_orders()
-        return [order for order in all_orders if order.get('current_state') == 'pending']
+        return self.list_orders(status='pending')
     
-    def get_orders_by_state(self, state: str) -> List[Dict]:
-        """Get orders filtered by specific state."""
-        all_orders = self.list_orders()
-        return [order for order in all_orders if order.get('current_state') == state]
+    def get_oldest_pending_order(self) -> Optional[Dict]:
+        """Get the longest-waiting pending order, or None if there is none."""
+        return self.get_oldest_order_by_state('pending')
+    
+    def get_oldest_order_by_state(self, state: str) -> Optional[Dict]:
+        """Get the longest-waiting order in a state, or None; the server sorts and returns one row."""
+        orders = self.get_orders_by_state(state, limit=1, sort='created_at')
+        return orders[0] if orders else None
+    
+    def get_orders_by_state(self, state: str, limit: int = 50, sort: str = None) -> List[Dict]:
+        """
+        Get orders filtered by specific state.
+        Use limit and sort='created_at' to fetch just the oldest few instead of scanning all of them.
+        """
+        return self.list_orders(limit=limit, status=state, sort=sort)
     
     # ============================================================================
     # WORKER/AGENT AUTOMATION
     # ============================================================================
     
-    def process_next_task(self, agent_id: str) -> Dict:
+    def process_next_task(self, agent_id: str, wait: float = 0, auto_advance: bool = False) -> Dict:
         """
-        Claim and process the next available task for this role.
+        Claim and process the next available task for this role in one server call.
+        With `wait`, the server holds the request until a task arrives or the wait expires.
+        With `auto_advance`, the server also queues the next happy-path transition and
+        returns its id as `next_task_id` (None when the order has no further step for this role).
         Returns task details and completion result.
         """
+        params = {"agent_id": agent_id, "wait": wait or None, "auto_advance": auto_advance or None}
+        return self._make_request("POST", "/queue/process", params=params,
+                                  timeout=self.timeout + wait)
+    
+    def process_next_task_two_step(self, agent_id: str) -> Dict:
+        """
+        Claim and process the next available task using separate claim and complete calls.
+        Useful when per-task logic must run between claiming and completing.
+        """
         # Claim next task
         claim_result = self.claim_next_task(agent_id)
         
@@ -287,7 +623,7 @@ class WarehouseClient:
         Args:
             agent_id: Unique identifier for this worker
             max_tasks: Maximum number of tasks to process (None for unlimited)
-            poll_interval: Seconds to wait between checking for new tasks
+            poll_interval: Seconds the server holds an idle claim open waiting for a new task
             
         Returns:
             List of processed task results
@@ -297,12 +633,16 @@ class WarehouseClient:
         
         processed_tasks = []
         task_count = 0
+        wait = 0
         
         self.logger.info(f"Starting worker {agent_id} (role: {self.role})")
         
         try:
             while max_tasks is None or task_count < max_tasks:
-                result = self.process_next_task(agent_id)
+                result = self.process_next_task(agent_id, wait=wait)
+                if 'action' in result:
+                    # Got a task: claim without waiting again until the queue runs dry
+                    wait = 0
                 
                 if result.get('action') == 'task_completed':
                     task_count += 1
@@ -321,13 +661,10 @@ class WarehouseClient:
                         self.logger.info("No tasks available")
                         break
                     else:
+                        # Long-poll: the next claim waits server-side for a task to arrive
                         self.logger.info("No more tasks available, waiting...")
-                        time.sleep(poll_interval)
+                        wait = poll_interval
                         continue
-                
-                # Brief pause between tasks
-                if poll_interval > 0:
-                    time.sleep(min(poll_interval, 0.1))
                     
         except KeyboardInterrupt:
             self.logger.info(f"Worker {agent_id} stopped by user")
@@ -0,0 +1,5 @@
+"""State machine expectations shared by the warehouse test suites"""
+
+EXPECTED_STATES = ("pending", "confirmed", "picking", "packed", "shipped", "delivered", "cancelled", "halted", "returned")
+DELIVERED_HISTORY = ["pending", "confirmed", "picking", "packed", "shipped", "delivered"]
+DELIVERY_TRANSITIONS = ("confirm", "start_picking", "pack", "ship", "deliver")
@@ -1,34 +1,112 @@
 import os
+import atexit
+import queue
 import random
 import time
 import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional, Set, FrozenSet, Tuple
 from enum import Enum
 from datetime import datetime, timedelta
 
 import mesa
+import numpy as np
+import requests
 from mesa.datacollection import DataCollector
 from mesa.visualization import SolaraViz, make_plot_component
 import solara
 
 # Import the dedicated warehouse client
 try:
-    from warehouse_client import WarehouseClient
+    from warehouse_client import WarehouseClient, create_session
 except ImportError:
     # Fallback if warehouse_client.py is not available
     print("Warning: warehouse_client.py not found. Please ensure it's in the same directory.")
     print("You can copy the WarehouseClient class from the warehouse_client.py file.")
     raise ImportError("warehouse_client module is required for this simulation")
 
-# Setup logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Logging is configured by the app entry points (setup_logging), not on import
+_log_listener: Optional[QueueListener] = None
+
+def setup_logging():
+    """
+    Route logging through a queue drained by a listener thread, so agent steps never block on stderr.
+    LOG_LEVEL=WARNING keeps high-throughput headless runs quiet; per-agent detail is at DEBUG.
+    Safe to call more than once.
+    """
+    global _log_listener
+    if _log_listener is not None:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+    enqueue = QueueHandler(log_queue)
+    enqueue.setFormatter(logging.Formatter("%(message)s"))  # Full format is applied once, by the listener
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), handlers=[enqueue])
+    
+    _log_listener = QueueListener(log_queue, stream)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
 logger = logging.getLogger(__name__)
 
 
+# Order states a customer may still cancel from
+CANCELLABLE_STATES = frozenset({'pending', 'confirmed', 'picking', 'packed'})
+
+# Fulfillment follow-up: state an order just reached -> transition to queue next
+NEXT_TRANSITIONS = {
+    "confirmed": "start_picking",
+    "picking": "pack",
+    "packed": "ship",
+    "shipped": "deliver",
+}
+AUTO_QUEUE_NOTE = "Auto-queued by simulation"
+
+# Most cancellable orders fetched for one customer's cancellation lookup
+CANCELLABLE_LOOKUP_LIMIT = 50
+
+# Base work time range (seconds) per transition, and for anything not listed
+WORK_TIME_RANGES = {
+    "confirm": (3, 7),
+    "start_picking": (8, 20),
+    "pack": (5, 12),
+    "ship": (3, 8),
+    "deliver": (15, 45),
+    "cancel_from_pending": (2, 4),
+    "cancel_from_confirmed": (3, 6),
+    "cancel_from_picking": (5, 10),
+    "cancel_from_packed": (6, 12),
+}
+DEFAULT_WORK_TIME_RANGE = (2, 5)
+
+# Operations where item count and experience weigh most
+COMPLEX_TRANSITIONS = frozenset({"start_picking", "pack"})
+
+# Operations followed by a quality check
+QUALITY_CHECK_TRANSITIONS = frozenset({"pack", "ship"})
+
+# Work time multiplier per fulfillment experience level (halved for simple operations)
+EXPERIENCE_FACTORS = {"junior": 1.2, "senior": 1.0, "expert": 0.8}
+EXPERIENCE_LEVELS = tuple(EXPERIENCE_FACTORS)
+
+# Errors the warehouse client raises for failed calls: transport failures, plus
+# ValueError/PermissionError for 400/404 and 403 responses. Anything else is a bug.
+API_ERRORS = (requests.exceptions.RequestException, ValueError, PermissionError)
+
+# Upper bound on idle poll intervals (pending-order dispatch and empty task claims),
+# as a multiple of fulfillment_check_interval
+MAX_POLL_BACKOFF = 8
+
+# Upper bound, in steps, on how long metrics collection skips the API after failures
+MAX_METRICS_BACKOFF = 1024
+
+
 class WarehouseZone(Enum):
     """Different warehouse zones with different characteristics"""
     ELECTRONICS = "electronics"
@@ -52,7 +130,62 @@ class ShiftType(Enum):
     NIGHT = "night"        # 10pm-6am
 
 
-@dataclass
+# Simulated clock: one step is one minute. Hours of the day each shift works, and the busy hours
+SHIFT_HOURS = {
+    ShiftType.MORNING: frozenset(range(6, 14)),
+    ShiftType.AFTERNOON: frozenset(range(14, 22)),
+    ShiftType.NIGHT: frozenset((22, 23, 0, 1, 2, 3, 4, 5)),
+}
+PEAK_HOURS = frozenset({11, 12, 13, 17, 18, 19})  # Lunch and evening
+
+# Enum members materialised once for per-agent sampling at creation
+ALL_ZONES = tuple(WarehouseZone)
+ALL_SHIFT_TYPES = tuple(ShiftType)
+
+
+class UniformBlock:
+    """Uniform [0, 1) samples drawn from a numpy Generator in blocks and handed out one at a time"""
+    __slots__ = ("_rng", "_size", "_values", "_index")
+
+    def __init__(self, rng: np.random.Generator, size: int = 1024):
+        self._rng = rng
+        self._size = size
+        self._values = rng.random(size).tolist()
+        self._index = 0
+
+    def next(self) -> float:
+        """Next sample in [0, 1), refilling the block when it runs out"""
+        if self._index == self._size:
+            self._values = self._rng.random(self._size).tolist()
+            self._index = 0
+        value = self._values[self._index]
+        self._index += 1
+        return value
+
+    def uniform(self, low: float, high: float) -> float:
+        """Next sample scaled to [low, high)"""
+        return low + (high - low) * self.next()
+
+
+# Customer type tables, looked up once per agent instead of branching on the type string
+CUSTOMER_TYPES = ("regular", "premium", "business")
+CUSTOMER_ORDER_FREQUENCY = {
+    "regular": 1.0,
+    "premium": 0.7,  # Orders more frequently
+    "business": 0.5   # Orders very frequently
+}
+CUSTOMER_EXPRESS_MULTIPLIER = {"regular": 1.0, "premium": 1.5, "business": 2.0}
+CUSTOMER_PEAK_INTERVAL_FACTOR = {"regular": 1.2, "premium": 1.0, "business": 1.0}  # Regulars avoid peak hours
+CUSTOMER_SATISFACTION_FLOOR = {"regular": 0.0, "premium": 0.0, "business": 0.8}  # Business orders regardless
+CUSTOMER_ZONE_WEIGHTS = {
+    # Business customers prefer electronics and books
+    "business": {WarehouseZone.ELECTRONICS: 1.5, WarehouseZone.BOOKS: 1.5},
+    # Premium customers prefer higher-value items
+    "premium": {WarehouseZone.ELECTRONICS: 1.3, WarehouseZone.FRAGILE: 1.3},
+}
+
+
+@dataclass(slots=True)
 class InventoryItem:
     """Represents an item in warehouse inventory"""
     name: str
@@ -64,6 +197,48 @@ class InventoryItem:
     weight: float = 1.0  # Affects packing time
 
 
+@dataclass(slots=True)
+class WorkInProgress:
+    """A completed task whose work an agent is still carrying out, in simulation steps"""
+    order_id: str
+    transition: str
+    new_state: str
+    work_time: float
+    steps_remaining: int
+    customer_name: Optional[str]  # Whose satisfaction a delivery updates; None if the order lookup failed
+
+
+def _env_flag(value: str) -> bool:
+    """Parse a true/false environment variable"""
+    return value.lower() == "true"
+
+
+# SimulationConfig.from_env table: (field, environment variable, parser, default)
+_ENV_SPEC = (
+    ("warehouse_url", "WAREHOUSE_URL", str, "http://warehouse-api:8000"),
+    ("num_customers", "NUM_CUSTOMERS", int, "8"),
+    ("num_fulfillment_agents", "NUM_FULFILLMENT_AGENTS", int, "3"),
+    ("max_concurrent_orders_per_agent", "MAX_CONCURRENT_ORDERS_PER_AGENT", int, "2"),
+    ("customer_order_interval_min", "CUSTOMER_ORDER_INTERVAL_MIN", int, "20"),
+    ("customer_order_interval_max", "CUSTOMER_ORDER_INTERVAL_MAX", int, "90"),
+    ("fulfillment_check_interval", "FULFILLMENT_CHECK_INTERVAL", int, "5"),
+    ("express_order_probability", "EXPRESS_ORDER_PROBABILITY", float, "0.15"),
+    ("equipment_failure_probability", "EQUIPMENT_FAILURE_PROBABILITY", float, "0.001"),
+    ("enable_shift_patterns", "ENABLE_SHIFT_PATTERNS", _env_flag, "true"),
+    ("enable_inventory_constraints", "ENABLE_INVENTORY_CONSTRAINTS", _env_flag, "true"),
+    ("enable_operational_disruptions", "ENABLE_OPERATIONAL_DISRUPTIONS", _env_flag, "true"),
+    ("simulation_speed_factor", "SIMULATION_SPEED_FACTOR", float, "0.1"),
+    ("step_delay", "STEP_DELAY", float, "0"),
+    ("realtime", "REALTIME", _env_flag, "false"),
+    ("collect_metrics", "COLLECT_METRICS", _env_flag, "true"),
+    ("collect_interval", "COLLECT_INTERVAL", int, "1"),
+    ("collect_agent_data", "COLLECT_AGENT_DATA", _env_flag, "true"),
+    ("parallel_stepping", "PARALLEL_STEPPING", _env_flag, "false"),
+    ("max_parallel_agents", "MAX_PARALLEL_AGENTS", int, "16"),
+    ("order_batch_size", "ORDER_BATCH_SIZE", int, "50"),
+)
+
+
 @dataclass
 class SimulationConfig:
     """Enhanced configuration for realistic warehouse simulation"""
@@ -102,6 +277,14 @@ class SimulationConfig:
     # Simulation control
     max_steps: int = 1000
     simulation_speed_factor: float = 0.1  # Speed up time
+    step_delay: float = 0.0  # Wall-clock pause between steps in run_model (seconds), for observation
+    realtime: bool = False  # Make agents actually wait out their (scaled) work time
+    collect_metrics: bool = True  # Per-step DataCollector rows; the dashboard plots need them
+    collect_interval: int = 1  # Collect every N steps; long headless runs can downsample
+    collect_agent_data: bool = True  # Per-agent reporter rows alongside the model series
+    parallel_stepping: bool = False  # Step agents concurrently so their API calls overlap
+    max_parallel_agents: int = 16
+    order_batch_size: int = 50  # Buffered customer orders are sent in batches of at most this many
     
     # Inventory items with realistic characteristics
     inventory_items: List[InventoryItem] = field(default_factory=lambda: [
@@ -173,6 +356,14 @@ class SimulationConfig:
             issues.append("max_steps must be positive")
         if self.simulation_speed_factor <= 0:
             issues.append("simulation_speed_factor must be positive")
+        if self.step_delay < 0:
+            issues.append("step_delay cannot be negative")
+        if self.collect_interval <= 0:
+            issues.append("collect_interval must be positive")
+        if self.max_parallel_agents <= 0:
+            issues.append("max_parallel_agents must be positive")
+        if self.order_batch_size <= 0:
+            issues.append("order_batch_size must be positive")
         if self.seasonal_demand_multiplier <= 0:
             issues.append("seasonal_demand_multiplier must be positive")
         if self.peak_hour_slowdown_factor <= 0:
@@ -198,57 +389,52 @@ class SimulationConfig:
     @classmethod
     def from_env(cls):
         """Create configuration from environment variables with enhanced options"""
-        return cls(
-            warehouse_url=os.getenv("WAREHOUSE_URL", "http://warehouse-api:8000"),
-            num_customers=int(os.getenv("NUM_CUSTOMERS", "8")),
-            num_fulfillment_agents=int(os.getenv("NUM_FULFILLMENT_AGENTS", "3")),
-            max_concurrent_orders_per_agent=int(os.getenv("MAX_CONCURRENT_ORDERS_PER_AGENT", "2")),
-            customer_order_interval_min=int(os.getenv("CUSTOMER_ORDER_INTERVAL_MIN", "20")),
-            customer_order_interval_max=int(os.getenv("CUSTOMER_ORDER_INTERVAL_MAX", "90")),
-            fulfillment_check_interval=int(os.getenv("FULFILLMENT_CHECK_INTERVAL", "5")),
-            express_order_probability=float(os.getenv("EXPRESS_ORDER_PROBABILITY", "0.15")),
-            equipment_failure_probability=float(os.getenv("EQUIPMENT_FAILURE_PROBABILITY", "0.001")),
-            enable_shift_patterns=os.getenv("ENABLE_SHIFT_PATTERNS", "true").lower() == "true",
-            enable_inventory_constraints=os.getenv("ENABLE_INVENTORY_CONSTRAINTS", "true").lower() == "true",
-            enable_operational_disruptions=os.getenv("ENABLE_OPERATIONAL_DISRUPTIONS", "true").lower() == "true",
-            simulation_speed_factor=float(os.getenv("SIMULATION_SPEED_FACTOR", "0.1")),
-        )
+        return cls(**{
+            name: parse(os.getenv(env_var, default))
+            for name, env_var, parse, default in _ENV_SPEC
+        })
 
     def wait_for_service(self, max_attempts: int = 30) -> bool:
         """Wait for warehouse service to be available"""
-        logger.info(f"Waiting for warehouse service at {self.warehouse_url}...")
+        logger.info("Waiting for warehouse service at %s...", self.warehouse_url)
+        # Use the dedicated client for health checks; one client keeps its connection across attempts
+        test_client = WarehouseClient(base_url=self.warehouse_url, role="customer")
         for attempt in range(max_attempts):
             try:
-                # Use the dedicated client for health checks
-                test_client = WarehouseClient(base_url=self.warehouse_url, role="customer")
-                health_result = test_client.health_check()
+                health_result = test_client.health_check(force=True)
                 if health_result and health_result.get('status') == 'healthy':
-                    logger.info(f"Warehouse service is ready after {attempt + 1} attempts")
+                    logger.info("Warehouse service is ready after %s attempts", attempt + 1)
                     return True
-            except Exception as e:
-                logger.debug(f"Attempt {attempt + 1}: {e}")
+            except API_ERRORS as e:
+                logger.debug("Attempt %s: %s", attempt + 1, e)
             if attempt < max_attempts - 1:
-                time.sleep(2)
-        logger.error(f"Failed to connect to warehouse service after {max_attempts} attempts")
+                # Exponential backoff with a little jitter, so a quick start is noticed quickly
+                time.sleep(min(0.2 * (2 ** attempt), 5.0) + random.uniform(0, 0.1))
+        logger.error("Failed to connect to warehouse service after %s attempts", max_attempts)
         return False
 
 
 class EnhancedCustomerAgent(mesa.Agent):
     """Enhanced customer agent with realistic behavior patterns using dedicated warehouse client"""
 
+    # Defaults for fulfillment-only reporter columns, so attribute reporters work on every agent
+    agent_type = "EnhancedCustomerAgent"
+    shift_name = "N/A"
+    total_orders_processed = 0
+    equipment_failures = 0
+    quality_failures = 0
+    processing_count = 0
+
     def __init__(self, model):
         super().__init__(model)
-        # Use the dedicated warehouse client
-        self.client = WarehouseClient(base_url=model.config.warehouse_url, role="customer")
+        # The model's customer-role client; it holds no per-caller state, so agents share it
+        self.client = model.order_client
         self.name = f"Customer_{self.unique_id}"
         
         # Customer characteristics
-        self.customer_type = random.choice(["regular", "premium", "business"])
-        self.order_frequency_modifier = {
-            "regular": 1.0,
-            "premium": 0.7,  # Orders more frequently
-            "business": 0.5   # Orders very frequently
-        }[self.customer_type]
+        self.customer_type = self.random.choice(CUSTOMER_TYPES)
+        self.order_frequency_modifier = CUSTOMER_ORDER_FREQUENCY[self.customer_type]
+        self._zone_weights = CUSTOMER_ZONE_WEIGHTS.get(self.customer_type, {})
         
         # Behavioral parameters
         base_interval_min = model.config.customer_order_interval_min
@@ -256,39 +442,49 @@ class EnhancedCustomerAgent(mesa.Agent):
         
         self.order_interval_min = int(base_interval_min * self.order_frequency_modifier)
         self.order_interval_max = int(base_interval_max * self.order_frequency_modifier)
+        self._peak_interval_factor = CUSTOMER_PEAK_INTERVAL_FACTOR[self.customer_type]
+        self._peak_order_threshold = int(self.order_interval_min * self._peak_interval_factor)
+        self._satisfaction_floor = CUSTOMER_SATISFACTION_FLOOR[self.customer_type]
         
-        self.cancellation_rate = random.uniform(
+        self.cancellation_rate = self.random.uniform(
             model.config.cancellation_rate_min,
             model.config.cancellation_rate_max
         )
         
         # Preferences
-        self.preferred_zones = random.sample(list(WarehouseZone), k=random.randint(2, 4))
-        self.express_probability = model.config.express_order_probability * (
-            2.0 if self.customer_type == "business" else 
-            1.5 if self.customer_type == "premium" else 1.0
-        )
+        self.preferred_zones = self.random.sample(ALL_ZONES, k=self.random.randint(2, 4))
+        self.express_probability = (model.config.express_order_probability *
+                                    CUSTOMER_EXPRESS_MULTIPLIER[self.customer_type])
         
         # State tracking
-        self.steps_since_last_order = random.randint(0, self.order_interval_max)
+        self.steps_since_last_order = self.random.randint(0, self.order_interval_max)
         self.total_orders_placed = 0
         self.total_orders_cancelled = 0
         self.total_express_orders = 0
         self.satisfaction_score = 1.0  # Affected by delivery performance
+        self.open_orders: Set[str] = set()  # Orders that may still be cancellable
+        
+        # Order notes for each priority, built once
+        self._order_notes = {priority: self._build_order_notes(priority) for priority in OrderPriority}
+        
+        # Pre-drawn samples for the ordering, priority and cancellation rolls and interval variation
+        self._uniforms = UniformBlock(model.rng)
+
+        logger.debug("Customer %s (%s) created", self.name, self.customer_type)
 
-        logger.info(f"Customer {self.name} ({self.customer_type}) created")
+    def _build_order_notes(self, priority: OrderPriority) -> str:
+        """Enhanced order notes for this customer type and priority"""
+        notes = f"{self.customer_type} customer order (Priority: {priority.value})"
+        if priority != OrderPriority.STANDARD:
+            notes += f" - {priority.value.upper()} PROCESSING REQUIRED"
+        return notes
 
     def step(self):
         """Enhanced customer behavior with business patterns"""
         self.steps_since_last_order += 1
         
         # Apply peak hour effects (slower ordering during busy times)
-        current_hour = (self.model.steps // 60) % 24
-        is_peak_hour = current_hour in [11, 12, 13, 17, 18, 19]  # Lunch and evening
-        
-        order_threshold = self.order_interval_min
-        if is_peak_hour and self.customer_type == "regular":
-            order_threshold = int(order_threshold * 1.2)  # Regular customers avoid peak hours
+        order_threshold = self._peak_order_threshold if self.model.is_peak_hour else self.order_interval_min
         
         if self.steps_since_last_order >= order_threshold:
             if self._should_place_order():
@@ -302,35 +498,26 @@ class EnhancedCustomerAgent(mesa.Agent):
         # Seasonal demand (could be time-based in real implementation)
         seasonal_factor = self.model.config.seasonal_demand_multiplier
         
-        # Satisfaction affects ordering frequency
-        satisfaction_factor = self.satisfaction_score
-        
-        # Business customers are less affected by satisfaction
-        if self.customer_type == "business":
-            satisfaction_factor = max(0.8, satisfaction_factor)
+        # Satisfaction affects ordering frequency (business customers less so)
+        satisfaction_factor = max(self._satisfaction_floor, self.satisfaction_score)
         
         probability = seasonal_factor * satisfaction_factor
-        return random.random() < probability
+        return self._uniforms.next() < probability
 
     def _try_place_order(self):
         """Enhanced order placement with realistic item selection"""
         try:
             # Select items based on preferences and availability
-            available_items = [
-                item for item in self.model.config.inventory_items
-                if item.zone in self.preferred_zones and 
-                   self.model.inventory_manager.is_available(item.name)
-            ]
+            inventory = self.model.inventory_manager
+            by_zone = inventory.available_by_zone()
+            available_items = [item for zone in self.preferred_zones for item in by_zone.get(zone, ())]
             
             if not available_items:
                 # Fall back to any available items
-                available_items = [
-                    item for item in self.model.config.inventory_items
-                    if self.model.inventory_manager.is_available(item.name)
-                ]
+                available_items = list(inventory.available_items())
             
             if not available_items:
-                logger.debug(f"{self.name}: No items available for order")
+                logger.debug("%s: No items available for order", self.name)
                 return
 
             # Select items with weighted preference for customer type
@@ -340,32 +527,36 @@ class EnhancedCustomerAgent(mesa.Agent):
             # Determine priority
             priority = self._determine_order_priority()
             
-            # Create order with enhanced notes
-            notes = f"{self.customer_type} customer order (Priority: {priority.value})"
+            # Buffered by the model and created together with other customers' orders
+            request = {"customer_name": self.name, "items": [item.name for item in selected_items],
+                       "notes": self._order_notes[priority]}
+            self.model.submit_order(self, request, selected_items, priority)
+
+        except API_ERRORS as e:
+            logger.error("%s: Exception placing order: %s", self.name, e)
+
+    def _record_order(self, order: Optional[Dict], selected_items: List[InventoryItem], priority: OrderPriority):
+        """Book-keeping once the model has created a buffered order"""
+        if not order:
+            logger.warning("%s: Failed to place order", self.name)
+            return
+        
+        order_id = order["order_id"]
+        self.open_orders.add(order_id)
+        self.total_orders_placed += 1
+        if priority != OrderPriority.STANDARD:
+            self.total_express_orders += 1
+        
+        with self.model.stats_lock:
+            self.model.total_orders_created += 1
             if priority != OrderPriority.STANDARD:
-                notes += f" - {priority.value.upper()} PROCESSING REQUIRED"
+                self.model.total_express_orders += 1
             
-            order = self.client.create_order(self.name, [item.name for item in selected_items], notes)
-            
-            if order:
-                order_id = order["order_id"]
-                self.total_orders_placed += 1
-                self.model.total_orders_created += 1
-                
-                if priority != OrderPriority.STANDARD:
-                    self.total_express_orders += 1
-                    self.model.total_express_orders += 1
-                
-                # Update inventory
-                for item in selected_items:
-                    self.model.inventory_manager.reserve_item(item.name, 1)
-                
-                logger.info(f"{self.name}: Created {priority.value} order {order_id} with {len(selected_items)} items")
-            else:
-                logger.warning(f"{self.name}: Failed to place order")
-
-        except Exception as e:
-            logger.error(f"{self.name}: Exception placing order: {e}")
+            # Update inventory
+            for item in selected_items:
+                self.model.inventory_manager.reserve_item(item.name, 1)
+        
+        logger.debug("%s: Created %s order %s with %s items", self.name, priority.value, order_id, len(selected_items))
 
     def _get_order_size(self) -> int:
         """Determine order size based on customer type"""
@@ -373,82 +564,66 @@ class EnhancedCustomerAgent(mesa.Agent):
         base_max = self.model.config.max_items_per_order
         
         if self.customer_type == "business":
-            return random.randint(max(base_min, 2), min(base_max + 2, 7))
+            return self.random.randint(max(base_min, 2), min(base_max + 2, 7))
         elif self.customer_type == "premium":
-            return random.randint(base_min, base_max + 1)
+            return self.random.randint(base_min, base_max + 1)
         else:
-            return random.randint(base_min, base_max)
+            return self.random.randint(base_min, base_max)
 
     def _select_items(self, available_items: List[InventoryItem], num_items: int) -> List[InventoryItem]:
         """Select items with realistic preferences"""
         # Weight items by customer type preferences
-        weights = []
-        for item in available_items:
-            weight = 1.0
-            
-            # Business customers prefer electronics and books
-            if self.customer_type == "business" and item.zone in [WarehouseZone.ELECTRONICS, WarehouseZone.BOOKS]:
-                weight *= 1.5
-            
-            # Premium customers prefer higher-value items
-            if self.customer_type == "premium" and item.zone in [WarehouseZone.ELECTRONICS, WarehouseZone.FRAGILE]:
-                weight *= 1.3
-            
-            weights.append(weight)
-        
-        # Select items with weighted random choice
-        selected = []
-        available_copy = available_items.copy()
-        weights_copy = weights.copy()
+        zone_weights = self._zone_weights
+        weights = np.array([zone_weights.get(item.zone, 1.0) for item in available_items])
         
-        for _ in range(min(num_items, len(available_copy))):
-            item = random.choices(available_copy, weights=weights_copy)[0]
-            idx = available_copy.index(item)
-            selected.append(available_copy.pop(idx))
-            weights_copy.pop(idx)
-        
-        return selected
+        # One weighted draw without replacement from the model's seeded generator
+        picks = self.model.rng.choice(len(available_items), size=min(num_items, len(available_items)),
+                                      replace=False, p=weights / weights.sum())
+        return [available_items[i] for i in picks]
 
     def _determine_order_priority(self) -> OrderPriority:
         """Determine order priority based on customer type and randomness"""
-        if random.random() < self.model.config.overnight_order_probability:
+        if self._uniforms.next() < self.model.config.overnight_order_probability:
             return OrderPriority.OVERNIGHT
-        elif random.random() < self.express_probability:
+        elif self._uniforms.next() < self.express_probability:
             return OrderPriority.EXPRESS
         else:
             return OrderPriority.STANDARD
 
     def _maybe_cancel_order(self):
         """Enhanced cancellation logic using dedicated client's convenience methods"""
-        if random.random() >= self.cancellation_rate:
+        if self._uniforms.next() >= self.cancellation_rate or not self.open_orders:
             return
 
         try:
-            # Get my recent orders that might be cancellable using convenience method
-            my_orders = self.client.get_my_orders(self.name)
+            # My cancellable orders, filtered server-side by customer and state
+            my_orders = self.client.list_orders(
+                limit=CANCELLABLE_LOOKUP_LIMIT, status=list(CANCELLABLE_STATES), customer_name=self.name
+            )
             
-            # Filter for cancellable orders
-            cancellable_orders = [
-                order for order in my_orders
-                if order.get('current_state') in ['pending', 'confirmed', 'picking', 'packed']
-            ]
+            # Anything missing from an untruncated listing is past packing and never cancellable again
+            if len(my_orders) < CANCELLABLE_LOOKUP_LIMIT:
+                self.open_orders.intersection_update(order['order_id'] for order in my_orders)
+            cancellable_orders = [order for order in my_orders if order['order_id'] in self.open_orders]
             
             if not cancellable_orders:
                 return
 
-            order_to_cancel = random.choice(cancellable_orders)
+            order_to_cancel = self.random.choice(cancellable_orders)
             order_id = order_to_cancel['order_id']
             
             # Use the dedicated client's cancel_order convenience method
             result = self.client.cancel_order(order_id, "Customer cancellation - changed requirements")
             
             if result:
+                self.open_orders.discard(order_id)
                 self.total_orders_cancelled += 1
-                self.model.total_orders_cancelled += 1
-                logger.info(f"{self.name}: Cancelled order {order_id}")
+                with self.model.stats_lock:
+                    self.model.total_orders_cancelled += 1
+                logger.debug("%s: Cancelled order %s", self.name, order_id)
 
-        except Exception as e:
-            logger.error(f"{self.name}: Exception during cancellation: {e}")
+        except API_ERRORS as e:
+            logger.error("%s: Exception during cancellation: %s", self.name, e)
 
     def _reset_order_interval(self):
         """Reset ordering interval with some variation"""
@@ -456,28 +631,44 @@ class EnhancedCustomerAgent(mesa.Agent):
         self.order_interval_min = int(
             self.model.config.customer_order_interval_min * 
             self.order_frequency_modifier * 
-            random.uniform(0.8, 1.2)
+            self._uniforms.uniform(0.8, 1.2)
         )
+        self._peak_order_threshold = int(self.order_interval_min * self._peak_interval_factor)
 
 
 class EnhancedFulfillmentAgent(mesa.Agent):
     """Enhanced fulfillment agent with realistic operational constraints using dedicated warehouse client"""
 
+    # Defaults for customer-only reporter columns, so attribute reporters work on every agent
+    agent_type = "EnhancedFulfillmentAgent"
+    customer_type = "N/A"
+    total_orders_placed = 0
+    total_orders_cancelled = 0
+    total_express_orders = 0
+    satisfaction_score = 1.0
+
     def __init__(self, model):
         super().__init__(model)
-        # Use the dedicated warehouse client
-        self.client = WarehouseClient(base_url=model.config.warehouse_url, role="fulfillment")
+        # The model's fulfillment-role client; it holds no per-caller state, so agents share it
+        self.client = model.dispatch_client
         self.name = f"Fulfillment_{self.unique_id}"
         self.agent_id = f"fulfillment_agent_{self.unique_id}"
+        self.auto_agent_id = f"{self.agent_id}_auto"  # Attributed to follow-up tasks this agent queues
         
         # Agent characteristics
-        self.skill_level = random.uniform(0.8, 1.2)  # Affects work speed
-        self.experience_level = random.choice(["junior", "senior", "expert"])
-        self.shift_type = random.choice(list(ShiftType))
-        self.specialized_zones = random.sample(list(WarehouseZone), k=random.randint(2, 3))
+        self.skill_level = self.random.uniform(0.8, 1.2)  # Affects work speed
+        self.experience_level = self.random.choice(EXPERIENCE_LEVELS)
+        experience_factor = EXPERIENCE_FACTORS[self.experience_level]
+        self._complex_work_factor = experience_factor / self.skill_level
+        self._simple_work_factor = (1.0 + (experience_factor - 1.0) * 0.5) / self.skill_level
+        self.shift_type = self.random.choice(ALL_SHIFT_TYPES)
+        self.shift_name = self.shift_type.value
+        self.specialized_zones: FrozenSet[WarehouseZone] = frozenset(
+            self.random.sample(ALL_ZONES, k=self.random.randint(2, 3))
+        )  # Picking elsewhere is slower
         
         # Operational state
-        self.currently_processing: Set[str] = set()  # Order IDs being processed
+        self.work_in_progress: Dict[str, WorkInProgress] = {}  # Tasks being worked on, by task ID
         self.max_concurrent = model.config.max_concurrent_orders_per_agent
         self.steps_since_last_check = 0
         self.check_interval = model.config.fulfillment_check_interval
@@ -488,58 +679,60 @@ class EnhancedFulfillmentAgent(mesa.Agent):
         self.equipment_failures = 0
         self.quality_failures = 0
         
-        # State flags
+        # State flags; a repair or break ends at wake_step, so nothing counts down in between
         self.equipment_broken = False
-        self.equipment_repair_time = 0
         self.on_break = False
-        self.break_time_remaining = 0
+        self.wake_step = 0
+        
+        # Pre-drawn samples for the break, equipment and quality rolls and work times
+        self._uniforms = UniformBlock(model.rng)
+        self._quality_failure_rate = model.config.quality_check_failure_rate
 
-        logger.info("Fulfillment agent creation begins here ...")
-        logger.info(f"Fulfillment agent {self.name} ({self.experience_level}, {self.shift_type.value} shift) created")
+        logger.debug("Fulfillment agent creation begins here ...")
+        logger.debug("Fulfillment agent %s (%s, %s shift) created", self.name, self.experience_level, self.shift_type.value)
 
     def step(self):
         """
         Enhanced fulfillment agent step logic. The agent processes tasks from the 
         warehouse API when available and not busy with equipment issues or breaks.
         """
-        logger.info(f"{self.name} entered the step function.")
-        logger.info(f"{self.name}: shift_patterns_enabled={self.model.config.enable_shift_patterns}, on_shift={self._is_on_shift()}")
-        # Add this debug block:
-        logger.info(f"{self.name}: equipment_broken={self.equipment_broken}")
-        logger.info(f"{self.name}: on_break={self.on_break}")
-        logger.info(f"{self.name}: currently_processing={len(self.currently_processing)}, max_concurrent={self.max_concurrent}")
-        logger.info(f"{self.name}: steps_since_last_check={self.steps_since_last_check}, check_interval={self.check_interval}")
-
-
-        # Handle equipment repairs
-        if self.equipment_broken:
-            self.equipment_repair_time -= 1
-            if self.equipment_repair_time <= 0:
-                self.equipment_broken = False
-                logger.info(f"{self.name}: Equipment repaired, back to work.")
-            return
-
-        # Handle breaks
-        if self.on_break:
-            self.break_time_remaining -= 1
-            if self.break_time_remaining <= 0:
-                self.on_break = False
-                logger.info(f"{self.name}: Break finished, back to work.")
+        # State dump; guarded because the shift check and len() run even when DEBUG is off
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s entered the step function.", self.name)
+            logger.debug("%s: shift_patterns_enabled=%s, on_shift=%s", self.name, self.model.config.enable_shift_patterns, self._is_on_shift())
+            logger.debug("%s: equipment_broken=%s", self.name, self.equipment_broken)
+            logger.debug("%s: on_break=%s", self.name, self.on_break)
+            logger.debug("%s: work_in_progress=%s, max_concurrent=%s", self.name, len(self.work_in_progress), self.max_concurrent)
+            logger.debug("%s: steps_since_last_check=%s, check_interval=%s", self.name, self.steps_since_last_check, self.check_interval)
+
+        # Handle equipment repairs and breaks
+        if self.equipment_broken or self.on_break:
+            if self.model.steps >= self.wake_step:
+                if self.equipment_broken:
+                    self.equipment_broken = False
+                    logger.debug("%s: Equipment repaired, back to work.", self.name)
+                else:
+                    self.on_break = False
+                    logger.debug("%s: Break finished, back to work.", self.name)
             return
         
+        # Carry on with claimed work; an agent finishes its current tasks even as its shift ends
+        if self.work_in_progress:
+            self._advance_work()
+        
         # Check if agent should be working based on shift patterns
         if self.model.config.enable_shift_patterns and not self._is_on_shift():
             return
         
         # Check if we should take a break (random chance based on work time)
         if (self.total_work_time > 0 and 
-            random.random() < 0.001 and  # Low probability per step
-            len(self.currently_processing) == 0):  # Only when not busy
+            self._uniforms.next() < 0.001 and  # Low probability per step
+            not self.work_in_progress):  # Only when not busy
             self._take_break()
             return
         
         # Process next available task if we have capacity
-        if len(self.currently_processing) < self.max_concurrent:
+        if len(self.work_in_progress) < self.max_concurrent:
             # Update step counter for periodic processing
             self.steps_since_last_check += 1
             
@@ -547,50 +740,44 @@ class EnhancedFulfillmentAgent(mesa.Agent):
             if self.steps_since_last_check >= self.check_interval:
                 self.steps_since_last_check = 0
                 self._process_next_task()
-        
-        # If we have ongoing work, continue processing it
-        # (This handles multi-step tasks that take time to complete)
-        if len(self.currently_processing) > 0:
-            # In a more detailed simulation, we could track individual task progress here
-            # For now, the _process_next_task() method handles the complete workflow
-            pass
+
+    @property
+    def processing_count(self) -> int:
+        """Number of orders this agent is currently working on"""
+        return len(self.work_in_progress)
+
     def _is_on_shift(self) -> bool:
         """Check if agent is currently on their shift"""
-        current_hour = (self.model.steps // 60) % 24
-        
-        if self.shift_type == ShiftType.MORNING:
-            return 6 <= current_hour < 14
-        elif self.shift_type == ShiftType.AFTERNOON:
-            return 14 <= current_hour < 22
-        else:  # NIGHT
-            return current_hour >= 22 or current_hour < 6
+        return self.model.current_hour in SHIFT_HOURS[self.shift_type]
 
     def _take_break(self):
         """Agent takes a break"""
         self.on_break = True
-        self.break_time_remaining = random.randint(10, 30)  # 10-30 steps
-        logger.info(f"{self.name}: Taking a break for {self.break_time_remaining} steps")
+        break_time = self.random.randint(10, 30)  # 10-30 steps
+        self.wake_step = self.model.steps + break_time
+        logger.debug("%s: Taking a break for %s steps", self.name, break_time)
 
 
     def _process_next_task(self):
         """Enhanced task processing with proactive pending order discovery"""
         try:
-            # Equipment failure check
-            if (self.model.config.enable_operational_disruptions and 
-                random.random() < self.model.config.equipment_failure_probability):
+            # Equipment failure check; only between tasks, like breaks, so claimed work never stalls
+            if (self.model.config.enable_operational_disruptions and not self.work_in_progress and
+                self._uniforms.next() < self.model.config.equipment_failure_probability):
                 self._equipment_failure()
                 return
             
-            # First try to get an existing queued task
+            # Take the next queued task; pending orders are queued for confirmation by the model.
+            # The follow-up transition is queued only once the simulated work is finished.
             result = self.client.process_next_task(self.agent_id)
-            logger.info(f"{self.name}: API returned: {result}")
-
-            # If no queued tasks available, look for pending orders to confirm
-            if result.get('message') == 'No fulfillment tasks available':
-                if self._queue_pending_confirmations():
-                    # Try again after queuing a confirmation task
-                    result = self.client.process_next_task(self.agent_id)
-                    logger.info(f"{self.name}: After queuing confirmation, API returned: {result}")
+            logger.debug("%s: API returned: %s", self.name, result)
+            
+            # Back off while the queue is empty; any claimed task restores the normal interval
+            base_interval = self.model.config.fulfillment_check_interval
+            if 'action' in result:
+                self.check_interval = base_interval
+            else:
+                self.check_interval = min(self.check_interval * 2, base_interval * MAX_POLL_BACKOFF)
 
             if result.get('action') == 'task_completed':
                 task = result['task']
@@ -600,224 +787,156 @@ class EnhancedFulfillmentAgent(mesa.Agent):
                 transition = task['transition']
                 new_state = task_result.get('new_state', 'unknown')
                 
-                # Add to currently processing during work simulation
-                self.currently_processing.add(order_id)
+                logger.debug("%s: Processing %s for order %s", self.name, transition, order_id)
                 
-                logger.info(f"{self.name}: Processing {transition} for order {order_id}")
+                # One order lookup serves the work time estimate and, on delivery, the satisfaction update
+                order_details = self._fetch_order(order_id)
+                customer_name = order_details.get('customer_name') if order_details else None
                 
                 # Calculate and simulate work time
-                base_work_time = self._get_work_time(transition, order_id)
+                base_work_time = self._get_work_time(transition, order_details)
                 actual_work_time = self._apply_agent_factors(base_work_time, transition)
                 
                 # Quality check for certain operations
-                if self._quality_check_required(transition) and not self._passes_quality_check():
+                if transition in QUALITY_CHECK_TRANSITIONS and self._uniforms.next() <= self._quality_failure_rate:
                     self._handle_quality_failure(task['task_id'], order_id, transition)
-                    self.currently_processing.discard(order_id)
                     return
                 
-                logger.info(f"{self.name}: Working on {transition} for {actual_work_time:.1f} seconds...")
-                time.sleep(actual_work_time * self.model.config.simulation_speed_factor)
-                
-                # Update metrics
-                self.total_orders_processed += 1
-                self.total_work_time += actual_work_time
-                self.model.total_orders_processed += 1
-                
-                logger.info(f"{self.name}: Completed {transition} -> {new_state} for order {order_id}")
-                
-                if new_state == "delivered":
-                    self.model.total_orders_completed += 1
-                    # Update customer satisfaction
-                    self._update_customer_satisfaction(order_id)
-                
-                # Auto-queue next transition for efficiency
-                self._queue_next_transition(order_id, new_state)
-                
-                # Remove from processing
-                self.currently_processing.discard(order_id)
+                logger.debug("%s: Working on %s for %.1f seconds...", self.name, transition, actual_work_time)
+                work = WorkInProgress(order_id, transition, new_state, actual_work_time, 0, customer_name)
+                if self.model.config.realtime:
+                    # Hold the agent for the scaled work time in wall-clock seconds and finish now
+                    time.sleep(actual_work_time * self.model.config.simulation_speed_factor)
+                    self._finish_work(work)
+                else:
+                    # Count the scaled work time down in simulation steps instead of blocking
+                    work.steps_remaining = max(1, int(actual_work_time * self.model.config.simulation_speed_factor))
+                    self.work_in_progress[task['task_id']] = work
                 
             elif result.get('action') == 'task_failed':
-                task = result['task']
-                logger.error(f"{self.name}: Task failed - {result.get('error', 'Unknown error')}")
-                self.currently_processing.discard(task.get('order_id', 'unknown'))
-
-        except Exception as e:
-            logger.error(f"{self.name}: Exception processing task: {e}")
-            # Clean up any stale processing state
-            if 'order_id' in locals():
-                self.currently_processing.discard(order_id)
+                logger.error("%s: Task failed - %s", self.name, result.get('error', 'Unknown error'))
+
+        except API_ERRORS + (KeyError,) as e:
+            logger.error("%s: Exception processing task: %s", self.name, e)
+
+    def _advance_work(self):
+        """Count down in-progress work by one step and finish whatever is done"""
+        finished = []
+        for task_id, work in self.work_in_progress.items():
+            work.steps_remaining -= 1
+            if work.steps_remaining <= 0:
+                finished.append(task_id)
+        for task_id in finished:
+            self._finish_work(self.work_in_progress.pop(task_id))
+
+    def _finish_work(self, work: WorkInProgress):
+        """Record a finished task and queue the order's next stage; it no longer occupies a work_in_progress slot"""
+        self.total_orders_processed += 1
+        self.total_work_time += work.work_time
+        with self.model.stats_lock:
+            self.model.total_orders_processed += 1
+            if work.new_state == "delivered":
+                self.model.total_orders_completed += 1
+        
+        logger.debug("%s: Completed %s -> %s for order %s", self.name, work.transition, work.new_state, work.order_id)
+        
+        if work.new_state == "delivered" and work.customer_name:
+            # Update customer satisfaction
+            self._update_customer_satisfaction(work.customer_name)
+        
+        self._queue_next_transition(work.order_id, work.new_state)
 
-    def _queue_pending_confirmations(self) -> bool:
-        """Check for pending orders and queue confirm tasks. Returns True if a task was queued."""
+    def _fetch_order(self, order_id: str) -> Optional[Dict]:
+        """Order details for a claimed task, or None if they cannot be fetched"""
         try:
-            orders = self.client.list_orders()
-            if not orders:
-                return False
-                
-            for order in orders:
-                if order.get('current_state') == 'pending':
-                    # Queue confirm task
-                    confirm_result = self.client.request_transition(
-                        order['order_id'], 
-                        'confirm', 
-                        notes="Auto-queued by fulfillment agent",
-                        agent_id=self.agent_id
-                    )
-                    if confirm_result:
-                        logger.info(f"{self.name}: Queued confirm task for pending order {order['order_id']}")
-                        return True  # Only queue one at a time to avoid overwhelming
-                        
-            return False  # No pending orders found
-            
-        except Exception as e:
-            logger.debug(f"{self.name}: Error queuing pending confirmations: {e}")
-            return False
-
-
+            return self.client.get_order(order_id) or None
+        except API_ERRORS:
+            return None
 
-    def _get_work_time(self, transition: str, order_id: str) -> float:
+    def _get_work_time(self, transition: str, order_details: Optional[Dict]) -> float:
         """Enhanced work time calculation with order-specific factors"""
-        base_times = {
-            "confirm": (3, 7),
-            "start_picking": (8, 20),
-            "pack": (5, 12),
-            "ship": (3, 8),
-            "deliver": (15, 45),
-            "cancel_from_pending": (2, 4),
-            "cancel_from_confirmed": (3, 6),
-            "cancel_from_picking": (5, 10),
-            "cancel_from_packed": (6, 12),
-        }
-        
-        min_time, max_time = base_times.get(transition, (2, 5))
-        base_time = random.uniform(min_time, max_time)
-        
-        # Apply order-specific factors
-        try:
-            order_details = self.client.get_order(order_id)
-            if order_details:
-                items = order_details.get('items', [])
-                
-                # More items = more time for picking and packing
-                if transition in ["start_picking", "pack"]:
-                    item_factor = 1.0 + (len(items) - 1) * 0.2
-                    base_time *= item_factor
-                
-                # Check if order contains items from agent's specialized zones
-                zone_factor = 1.0
-                if transition == "start_picking":
-                    for item_name in items:
-                        item = next((i for i in self.model.config.inventory_items if i.name == item_name), None)
-                        if item and item.zone not in self.specialized_zones:
-                            zone_factor *= 1.2  # Takes longer in unfamiliar zones
-                
-                base_time *= zone_factor
+        min_time, max_time = WORK_TIME_RANGES.get(transition, DEFAULT_WORK_TIME_RANGE)
+        base_time = self._uniforms.uniform(min_time, max_time)
         
-        except Exception:
-            pass  # Use base time if order details unavailable
+        # Apply order-specific factors; use base time if order details unavailable
+        if order_details:
+            items = order_details.get('items', [])
+            
+            # More items = more time for picking and packing
+            if transition in COMPLEX_TRANSITIONS:
+                item_factor = 1.0 + (len(items) - 1) * 0.2
+                base_time *= item_factor
+            
+            # Check if order contains items from agent's specialized zones
+            if transition == "start_picking":
+                item_by_name = self.model.inventory_manager.item_by_name
+                unfamiliar = sum(
+                    1 for item_name in items
+                    if item_name in item_by_name and item_by_name[item_name].zone not in self.specialized_zones
+                )
+                base_time *= 1.2 ** unfamiliar  # Takes longer in unfamiliar zones
         
         return base_time
 
     def _apply_agent_factors(self, base_time: float, transition: str) -> float:
         """Apply agent-specific factors to work time"""
-        # Skill level affects all work
-        time_with_skill = base_time / self.skill_level
-        
-        # Experience level affects complex operations more
-        experience_factors = {
-            "junior": 1.2,
-            "senior": 1.0,
-            "expert": 0.8
-        }
-        
-        if transition in ["start_picking", "pack"]:  # Complex operations
-            time_with_experience = time_with_skill * experience_factors[self.experience_level]
+        # Skill and experience combined once per agent; experience counts fully on complex operations
+        if transition in COMPLEX_TRANSITIONS:
+            time_with_experience = base_time * self._complex_work_factor
         else:
-            time_with_experience = time_with_skill * (1.0 + (experience_factors[self.experience_level] - 1.0) * 0.5)
+            time_with_experience = base_time * self._simple_work_factor
         
         # Peak hour slowdown
-        current_hour = (self.model.steps // 60) % 24
-        is_peak_hour = current_hour in [11, 12, 13, 17, 18, 19]
-        
-        if is_peak_hour:
+        if self.model.is_peak_hour:
             time_with_experience *= self.model.config.peak_hour_slowdown_factor
         
         return time_with_experience
 
-    def _quality_check_required(self, transition: str) -> bool:
-        """Determine if quality check is required for this transition"""
-        return transition in ["pack", "ship"]
-
-    def _passes_quality_check(self) -> bool:
-        """Perform quality check"""
-        return random.random() > self.model.config.quality_check_failure_rate
-
     def _handle_quality_failure(self, task_id: str, order_id: str, transition: str):
         """Handle quality check failure - task is already completed by dedicated client, log the failure"""
         self.quality_failures += 1
-        self.model.total_quality_failures += 1
+        with self.model.stats_lock:
+            self.model.total_quality_failures += 1
         
         # Note: The dedicated client's process_next_task already handled the task completion
         # We just need to log this as a quality failure for metrics
-        logger.warning(f"{self.name}: Quality check failed for {transition} on order {order_id}")
+        logger.warning("%s: Quality check failed for %s on order %s", self.name, transition, order_id)
         
         # In a real system, this might trigger rework or quality control processes
 
     def _equipment_failure(self):
         """Handle equipment failure"""
         self.equipment_broken = True
-        self.equipment_repair_time = random.randint(30, 120)  # 30-120 steps to repair
+        repair_time = self.random.randint(30, 120)  # 30-120 steps to repair
+        self.wake_step = self.model.steps + repair_time
         self.equipment_failures += 1
-        self.model.total_equipment_failures += 1
-        logger.warning(f"{self.name}: Equipment failure! Repair time: {self.equipment_repair_time} steps")
+        with self.model.stats_lock:
+            self.model.total_equipment_failures += 1
+        logger.warning("%s: Equipment failure! Repair time: %s steps", self.name, repair_time)
 
-    def _update_customer_satisfaction(self, order_id: str):
+    def _update_customer_satisfaction(self, customer_name: str):
         """Update customer satisfaction based on delivery performance"""
-        try:
-            order_details = self.client.get_order(order_id)
-            if order_details:
-                customer_name = order_details.get('customer_name')
-                # Find customer agent and update satisfaction
-                for agent in self.model.agents:
-                    if (isinstance(agent, EnhancedCustomerAgent) and 
-                        agent.name == customer_name):
-                        # Check delivery time vs expectations
-                        created_time = order_details.get('created_at')
-                        # Simplified satisfaction update
-                        agent.satisfaction_score = min(1.0, agent.satisfaction_score + 0.1)
-                        break
-        except Exception:
-            pass
+        agent = self.model.customer_by_name.get(customer_name)
+        if agent:
+            # Simplified satisfaction update
+            agent.satisfaction_score = min(1.0, agent.satisfaction_score + 0.1)
 
     def _queue_next_transition(self, order_id: str, current_state: str):
         """Queue the next transition using dedicated client's convenience methods"""
+        transition = NEXT_TRANSITIONS.get(current_state)
+        if transition is None:
+            # No next transition for this state
+            return
+        
         try:
-            # Use the dedicated client's state-specific methods for better integration
-            if current_state == "confirmed":
-                result = self.client.request_transition(order_id, 'start_picking', 
-                                                       notes="Auto-queued by simulation",
-                                                       agent_id=f"{self.agent_id}_auto")
-            elif current_state == "picking":
-                result = self.client.request_transition(order_id, 'pack',
-                                                       notes="Auto-queued by simulation", 
-                                                       agent_id=f"{self.agent_id}_auto")
-            elif current_state == "packed":
-                result = self.client.request_transition(order_id, 'ship',
-                                                       notes="Auto-queued by simulation",
-                                                       agent_id=f"{self.agent_id}_auto")
-            elif current_state == "shipped":
-                result = self.client.request_transition(order_id, 'deliver',
-                                                       notes="Auto-queued by simulation",
-                                                       agent_id=f"{self.agent_id}_auto")
-            else:
-                # No next transition for this state
-                return
-                
+            result = self.client.request_transition(order_id, transition,
+                                                   notes=AUTO_QUEUE_NOTE,
+                                                   agent_id=self.auto_agent_id)
             if result:
-                logger.debug(f"{self.name}: Queued next transition for order {order_id} from {current_state}")
+                logger.debug("%s: Queued next transition for order %s from %s", self.name, order_id, current_state)
 
-        except Exception as e:
-            logger.debug(f"{self.name}: Error queuing next transition: {e}")
+        except API_ERRORS as e:
+            logger.debug("%s: Error queuing next transition: %s", self.name, e)
 
 
 class InventoryManager:
@@ -825,53 +944,90 @@ class InventoryManager:
     
     def __init__(self, config: SimulationConfig):
         self.config = config
-        self.inventory: Dict[str, int] = {}
-        self.reserved: Dict[str, int] = {}
         
-        # Initialize inventory
-        for item in config.inventory_items:
-            self.inventory[item.name] = item.stock_level
-            self.reserved[item.name] = 0
+        # Initialize inventory as parallel arrays indexed by catalog position
+        items = config.inventory_items
+        self._index: Dict[str, int] = {item.name: i for i, item in enumerate(items)}
+        self.inventory = np.array([item.stock_level for item in items], dtype=np.int64)
+        self.reserved = np.zeros(len(items), dtype=np.int64)
+        self.reorder_points = np.array([item.reorder_point for item in items], dtype=np.int64)
+        self.item_by_name: Dict[str, InventoryItem] = {item.name: item for item in items}
+        
+        # Available items (flat, by zone) shared by all customers, rebuilt only after stock changes.
+        # Both views live in one tuple that is swapped in whole, so threaded readers never see a partial rebuild.
+        self._available: Optional[Tuple[List[InventoryItem], Dict[WarehouseZone, List[InventoryItem]]]] = None
+    
+    def available_items(self) -> List[InventoryItem]:
+        """Get items that can currently be ordered (cached until the next stock change)"""
+        return (self._available or self._refresh_available())[0]
+    
+    def available_by_zone(self) -> Dict[WarehouseZone, List[InventoryItem]]:
+        """Orderable items grouped by zone (cached with available_items)"""
+        return (self._available or self._refresh_available())[1]
+    
+    def _refresh_available(self) -> Tuple[List[InventoryItem], Dict[WarehouseZone, List[InventoryItem]]]:
+        """Rebuild the available-item caches with one array comparison over the catalog"""
+        if self.config.enable_inventory_constraints:
+            in_stock = (self.inventory - self.reserved >= 1).tolist()
+        else:
+            in_stock = [True] * len(self._index)
+        
+        items: List[InventoryItem] = []
+        by_zone: Dict[WarehouseZone, List[InventoryItem]] = {}
+        for item, available in zip(self.config.inventory_items, in_stock):
+            if available:
+                items.append(item)
+                by_zone.setdefault(item.zone, []).append(item)
+        
+        available = (items, by_zone)
+        self._available = available
+        return available
     
     def is_available(self, item_name: str, quantity: int = 1) -> bool:
         """Check if item is available for order"""
         if not self.config.enable_inventory_constraints:
             return True
         
-        available = self.inventory.get(item_name, 0) - self.reserved.get(item_name, 0)
-        return available >= quantity
+        i = self._index.get(item_name)
+        return i is not None and int(self.inventory[i] - self.reserved[i]) >= quantity
     
     def reserve_item(self, item_name: str, quantity: int = 1):
         """Reserve item for order"""
         if self.config.enable_inventory_constraints:
-            self.reserved[item_name] = self.reserved.get(item_name, 0) + quantity
+            self.reserved[self._index[item_name]] += quantity
+            self._available = None
     
     def consume_item(self, item_name: str, quantity: int = 1):
         """Consume item when order is shipped"""
         if self.config.enable_inventory_constraints:
-            self.inventory[item_name] = max(0, self.inventory.get(item_name, 0) - quantity)
-            self.reserved[item_name] = max(0, self.reserved.get(item_name, 0) - quantity)
+            i = self._index[item_name]
+            self.inventory[i] = max(0, self.inventory[i] - quantity)
+            self.reserved[i] = max(0, self.reserved[i] - quantity)
+            self._available = None
     
     def restock_item(self, item_name: str, quantity: int):
         """Restock item (supplier delivery)"""
-        self.inventory[item_name] = self.inventory.get(item_name, 0) + quantity
+        self.inventory[self._index[item_name]] += quantity
+        self._available = None
     
     def get_low_stock_items(self) -> List[str]:
         """Get items that are below reorder point"""
-        low_stock = []
-        for item in self.config.inventory_items:
-            if self.inventory.get(item.name, 0) <= item.reorder_point:
-                low_stock.append(item.name)
-        return low_stock
+        items = self.config.inventory_items
+        return [items[i].name for i in np.flatnonzero(self.inventory <= self.reorder_points)]
+    
+    def total_reserved(self) -> int:
+        """Units reserved across all items"""
+        return int(self.reserved.sum())
     
     def get_inventory_summary(self) -> Dict[str, Dict[str, int]]:
         """Get complete inventory summary"""
         summary = {}
-        for item in self.config.inventory_items:
+        for i, item in enumerate(self.config.inventory_items):
+            stock, reserved = int(self.inventory[i]), int(self.reserved[i])
             summary[item.name] = {
-                "stock": self.inventory.get(item.name, 0),
-                "reserved": self.reserved.get(item.name, 0),
-                "available": self.inventory.get(item.name, 0) - self.reserved.get(item.name, 0),
+                "stock": stock,
+                "reserved": reserved,
+                "available": stock - reserved,
                 "reorder_point": item.reorder_point
             }
         return summary
@@ -880,12 +1036,6 @@ class InventoryManager:
 class EnhancedWarehouseModel(mesa.Model):
     def __init__(self, config=None, seed=None):
         super().__init__(seed=seed)
-
-        model_ref = self  # Store reference to the model
-        self.schedule = type('SimpleScheduler', (), {
-            'step': lambda scheduler_self: [agent.step() for agent in model_ref.agents],
-            'add': lambda scheduler_self, agent: None  # Agents are already in model_ref.agents
-        })()
         
         self.config = config or SimulationConfig.from_env()
         
@@ -905,138 +1055,278 @@ class EnhancedWarehouseModel(mesa.Model):
         self.total_equipment_failures = 0
         self.total_quality_failures = 0
         self.total_weather_delays = 0
+        
+        # Simulated time of day, refreshed at the start of each step
+        self._update_clock()
+        
+        # Pre-drawn samples for the per-step weather delay roll
+        self._weather_rolls = UniformBlock(self.rng)
+        
+        # Guards shared counters and inventory when agents step concurrently
+        self.stats_lock = threading.Lock()
+        self._step_pool = (
+            ThreadPoolExecutor(max_workers=self.config.max_parallel_agents, thread_name_prefix="agent-step")
+            if self.config.parallel_stepping else None
+        )
 
+        # Per-step order state counts, fetched once and shared by the state reporters
+        self._state_counts: Counter = Counter()
+        self._state_counts_step = -1
+        self._server_counts = True  # Cleared once if the server has no /orders/counts
+        
+        # Metrics reads back off while the API is failing, reporting zeros until the retry step
+        self._metrics_retry_step = 0
+        self._metrics_backoff = 1
+        
+        # Queue size for the metrics, fetched alongside the state counts on a small I/O pool
+        self._queue_size = 0
+        self._io_pool = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-io")
+            if self.config.collect_metrics else None
+        )
+        
         # Initialize inventory manager
         self.inventory_manager = InventoryManager(self.config)
+        
+        # One keep-alive connection pool shared by the model's clients
+        # (one keep-alive connection per concurrently stepping agent, plus the model's own calls)
+        self.session = create_session(
+            pool_maxsize=self.config.num_customers + self.config.num_fulfillment_agents + 2
+        )
+        
+        # Fulfillment-role client: the pending-order dispatcher, metrics reads, and every fulfillment agent
+        self.dispatch_client = WarehouseClient(base_url=self.config.warehouse_url, role="fulfillment",
+                                               session=self.session)
+        self._confirm_poll_interval = self.config.fulfillment_check_interval
+        self._next_confirm_poll = 0
+        # Pending orders that already have a confirm task queued, so later polls skip them
+        self._confirm_queued: Set[str] = set()
+        
+        # Customer-role client: batched order placement and every customer agent's cancellations
+        self.order_client = WarehouseClient(base_url=self.config.warehouse_url, role="customer",
+                                            session=self.session)
+        self._order_buffer: List[tuple] = []
+        self._order_buffer_lock = threading.Lock()
 
-        # Create enhanced agents and add to scheduler
+        # Create enhanced agents; Mesa registers each one in self.agents
         for _ in range(self.config.num_customers):
-            agent = EnhancedCustomerAgent(self)
-            self.schedule.add(agent)
+            EnhancedCustomerAgent(self)
         for _ in range(self.config.num_fulfillment_agents):
-            agent = EnhancedFulfillmentAgent(self)
-            self.schedule.add(agent)
-
-        # Enhanced data collector
-        self.datacollector = DataCollector(
-            model_reporters={
-                # Core metrics
-                "Total Orders Created": "total_orders_created",
-                "Total Orders Processed": "total_orders_processed", 
-                "Total Orders Completed": "total_orders_completed",
-                "Total Orders Cancelled": "total_orders_cancelled",
-                "Total Express Orders": "total_express_orders",
+            EnhancedFulfillmentAgent(self)
+        
+        # Agent composition is fixed from here on, so the per-step metric passes use a plain tuple
+        # and deliveries find their customer by name
+        self.fulfillment_agents = tuple(self.agents_by_type.get(EnhancedFulfillmentAgent, ()))
+        self.customer_by_name: Dict[str, EnhancedCustomerAgent] = {
+            agent.name: agent for agent in self.agents_by_type.get(EnhancedCustomerAgent, ())
+        }
+
+        # Enhanced data collector (headless runs that only need the final report can skip it)
+        self.datacollector = None
+        if self.config.collect_metrics:
+            self.datacollector = DataCollector(
+                model_reporters={
+                    # Core metrics
+                    "Total Orders Created": "total_orders_created",
+                    "Total Orders Processed": "total_orders_processed", 
+                    "Total Orders Completed": "total_orders_completed",
+                    "Total Orders Cancelled": "total_orders_cancelled",
+                    "Total Express Orders": "total_express_orders",
                 
-                # Operational metrics
-                "Equipment Failures": "total_equipment_failures",
-                "Quality Failures": "total_quality_failures",
-                "Weather Delays": "total_weather_delays",
+                    # Operational metrics
+                    "Equipment Failures": "total_equipment_failures",
+                    "Quality Failures": "total_quality_failures",
+                    "Weather Delays": "total_weather_delays",
                 
-                # Performance metrics
-                "Orders in Pipeline": lambda m: m.total_orders_created - m.total_orders_completed - m.total_orders_cancelled,
-                "Fulfillment Rate (%)": lambda m: (m.total_orders_completed / max(1, m.total_orders_created)) * 100,
-                "Express Order Rate (%)": lambda m: (m.total_express_orders / max(1, m.total_orders_created)) * 100,
-                "Quality Failure Rate (%)": lambda m: (m.total_quality_failures / max(1, m.total_orders_processed)) * 100,
+                    # Performance metrics
+                    "Orders in Pipeline": "orders_in_pipeline",
+                    "Fulfillment Rate (%)": "fulfillment_rate",
+                    "Express Order Rate (%)": "express_order_rate",
+                    "Quality Failure Rate (%)": "quality_failure_rate",
                 
-                # State tracking
-                "Pending Orders": lambda m: m._count_orders_by_state("pending"),
-                "Confirmed Orders": lambda m: m._count_orders_by_state("confirmed"),
-                "Picking Orders": lambda m: m._count_orders_by_state("picking"),
-                "Packed Orders": lambda m: m._count_orders_by_state("packed"),
-                "Shipped Orders": lambda m: m._count_orders_by_state("shipped"),
-                "Delivered Orders": lambda m: m._count_orders_by_state("delivered"),
-                "Cancelled Orders": lambda m: m._count_orders_by_state("cancelled"),
+                    # State tracking
+                    "Pending Orders": lambda m: m._count_orders_by_state("pending"),
+                    "Confirmed Orders": lambda m: m._count_orders_by_state("confirmed"),
+                    "Picking Orders": lambda m: m._count_orders_by_state("picking"),
+                    "Packed Orders": lambda m: m._count_orders_by_state("packed"),
+                    "Shipped Orders": lambda m: m._count_orders_by_state("shipped"),
+                    "Delivered Orders": lambda m: m._count_orders_by_state("delivered"),
+                    "Cancelled Orders": lambda m: m._count_orders_by_state("cancelled"),
                 
-                # Inventory metrics
-                "Low Stock Items": lambda m: len(m.inventory_manager.get_low_stock_items()),
-                "Total Reserved Items": lambda m: sum(m.inventory_manager.reserved.values()),
+                    # Inventory metrics
+                    "Low Stock Items": lambda m: len(m.inventory_manager.get_low_stock_items()),
+                    "Total Reserved Items": lambda m: m.inventory_manager.total_reserved(),
                 
-                # Queue and capacity metrics
-                "Queue Size": lambda m: m._get_queue_size(),
-                "Agents Working": lambda m: m._count_working_agents(),
-                "Agents on Break": lambda m: m._count_agents_on_break(),
-                "Agents with Broken Equipment": lambda m: m._count_agents_with_broken_equipment(),
-            },
-            agent_reporters={
-                "Agent Type": lambda a: type(a).__name__,
-                "Customer Type": lambda a: getattr(a, "customer_type", "N/A"),
-                "Shift Type": lambda a: getattr(a, "shift_type", "N/A").value if hasattr(getattr(a, "shift_type", None), "value") else "N/A",
-                "Orders Placed": lambda a: getattr(a, "total_orders_placed", 0),
-                "Orders Cancelled": lambda a: getattr(a, "total_orders_cancelled", 0),
-                "Orders Processed": lambda a: getattr(a, "total_orders_processed", 0),
-                "Express Orders": lambda a: getattr(a, "total_express_orders", 0),
-                "Equipment Failures": lambda a: getattr(a, "equipment_failures", 0),
-                "Quality Failures": lambda a: getattr(a, "quality_failures", 0),
-                "Satisfaction Score": lambda a: getattr(a, "satisfaction_score", 1.0),
-                "Currently Processing": lambda a: len(getattr(a, "currently_processing", set())),
-            },
-        )
+                    # Queue and capacity metrics
+                    "Queue Size": lambda m: m._get_queue_size(),
+                    "Agents Working": lambda m: m._count_working_agents(),
+                    "Agents on Break": lambda m: m._count_agents_on_break(),
+                    "Agents with Broken Equipment": lambda m: m._count_agents_with_broken_equipment(),
+                },
+                # Plain attribute reporters; both agent classes define defaults for the other's columns
+                agent_reporters={} if not self.config.collect_agent_data else {
+                    "Agent Type": "agent_type",
+                    "Customer Type": "customer_type",
+                    "Shift Type": "shift_name",
+                    "Orders Placed": "total_orders_placed",
+                    "Orders Cancelled": "total_orders_cancelled",
+                    "Orders Processed": "total_orders_processed",
+                    "Express Orders": "total_express_orders",
+                    "Equipment Failures": "equipment_failures",
+                    "Quality Failures": "quality_failures",
+                    "Satisfaction Score": "satisfaction_score",
+                    "Currently Processing": "processing_count",
+                },
+            )
 
         self._test_warehouse_connection()
-        logger.info(f"Enhanced simulation initialized with {len(self.agents)} agents")
+        logger.info("Enhanced simulation initialized with %s agents", len(self.agents))
+
+
+    @property
+    def orders_in_pipeline(self) -> int:
+        """Orders created but neither completed nor cancelled"""
+        return self.total_orders_created - self.total_orders_completed - self.total_orders_cancelled
+
+    @property
+    def fulfillment_rate(self) -> float:
+        """Completed orders as a percentage of created orders"""
+        return self.total_orders_completed * 100 / max(1, self.total_orders_created)
+
+    @property
+    def express_order_rate(self) -> float:
+        """Express orders as a percentage of created orders"""
+        return self.total_express_orders * 100 / max(1, self.total_orders_created)
 
+    @property
+    def quality_failure_rate(self) -> float:
+        """Quality failures as a percentage of processed orders"""
+        return self.total_quality_failures * 100 / max(1, self.total_orders_processed)
+
+    def _step_agents(self):
+        """Step customers, then fulfillment agents, each group in random order.
+        
+        Orders the customers placed are created between the two phases, so fulfillment
+        sees them in the same tick.
+        """
+        for agent_type in (EnhancedCustomerAgent, EnhancedFulfillmentAgent):
+            group = self.agents_by_type.get(agent_type)
+            if group:
+                self._step_group(group)
+            if agent_type is EnhancedCustomerAgent:
+                self._flush_orders()
+
+    def _step_group(self, group):
+        """Step one agent group, overlapping their blocking API calls when parallel stepping is on"""
+        if self._step_pool is None:
+            group.shuffle_do("step")
+            return
+        
+        # Wait for the whole group before moving on; surface the first agent error
+        for future in [self._step_pool.submit(agent.step) for agent in group.shuffle()]:
+            future.result()
 
     def _count_orders_by_state(self, state: str) -> int:
-        """Count orders in specific state using dedicated client"""
+        """Count orders in specific state from this step's shared order snapshot"""
+        return self._order_state_counts().get(state, 0)
+
+    def _order_state_counts(self) -> Counter:
+        """Count orders per state with one small API call per step, shared by every state reporter"""
+        if self._state_counts_step == self.steps:
+            return self._state_counts
+        
+        counts = Counter()
+        if self.steps < self._metrics_retry_step:
+            self._state_counts = counts
+            self._state_counts_step = self.steps
+            return counts
+        
         try:
-            fulfillment_agents = [a for a in self.agents if isinstance(a, EnhancedFulfillmentAgent)]
-            if fulfillment_agents:
-                client = fulfillment_agents[0].client
-                orders = client.list_orders()
+            server_counts = self.dispatch_client.count_orders_by_state() if self._server_counts else None
+            if server_counts is not None:
+                counts = Counter(server_counts)
+            else:
+                # Servers without /orders/counts: count a page of listed orders instead
+                self._server_counts = False
+                orders = self.dispatch_client.list_orders()
                 if orders:
-                    return len([o for o in orders if o.get('current_state') == state])
-            return 0
-        except Exception:
-            return 0
+                    counts = Counter(o.get('current_state') for o in orders)
+            self._metrics_backoff = 1
+        except API_ERRORS:
+            self._metrics_retry_step = self.steps + self._metrics_backoff
+            self._metrics_backoff = min(self._metrics_backoff * 2, MAX_METRICS_BACKOFF)
+        
+        self._state_counts = counts
+        self._state_counts_step = self.steps
+        return counts
 
     def _get_queue_size(self) -> int:
+        """Total queue size as prefetched for this step"""
+        return self._queue_size
+
+    def _prefetch_metrics(self):
+        """Fetch the queue status while the order state counts load, so collection costs one round trip"""
+        if self.steps < self._metrics_retry_step:
+            self._queue_size = 0
+            self._order_state_counts()
+            return
+        queue_future = self._io_pool.submit(self._fetch_queue_size)
+        self._order_state_counts()
+        self._queue_size = queue_future.result()
+
+    def _fetch_queue_size(self) -> int:
         """Get total queue size using dedicated client"""
         try:
-            fulfillment_agents = [a for a in self.agents if isinstance(a, EnhancedFulfillmentAgent)]
-            if fulfillment_agents:
-                client = fulfillment_agents[0].client
-                status = client.get_queue_status()
-                if status:
-                    return status.get("total_queued", 0)
+            status = self.dispatch_client.get_queue_status()
+            if status:
+                return status.get("total_queued", 0)
             return 0
-        except Exception:
+        except API_ERRORS:
             return 0
 
     def _count_working_agents(self) -> int:
         """Count agents currently working"""
         count = 0
-        for agent in self.agents:
-            if isinstance(agent, EnhancedFulfillmentAgent):
-                if (not agent.equipment_broken and not agent.on_break and 
-                    len(agent.currently_processing) > 0):
-                    count += 1
+        for agent in self.fulfillment_agents:
+            if (not agent.equipment_broken and not agent.on_break and 
+                agent.work_in_progress):
+                count += 1
         return count
 
+    def _count_idle_agents(self) -> int:
+        """Count on-shift agents free to take a task"""
+        return sum(1 for a in self.fulfillment_agents
+                   if not (a.equipment_broken or a.on_break or a.work_in_progress) and a._is_on_shift())
+
     def _count_agents_on_break(self) -> int:
         """Count agents on break"""
-        return len([a for a in self.agents if isinstance(a, EnhancedFulfillmentAgent) and a.on_break])
+        return sum(1 for a in self.fulfillment_agents if a.on_break)
 
     def _count_agents_with_broken_equipment(self) -> int:
         """Count agents with broken equipment"""
-        return len([a for a in self.agents if isinstance(a, EnhancedFulfillmentAgent) and a.equipment_broken])
+        return sum(1 for a in self.fulfillment_agents if a.equipment_broken)
 
     def _test_warehouse_connection(self):
-        """Test connection to warehouse service using dedicated client"""
+        """Test connection to warehouse service over the shared session"""
         try:
-            test_client = WarehouseClient(base_url=self.config.warehouse_url, role="customer")
-            health_result = test_client.health_check()
+            health_result = self.dispatch_client.health_check()
             if health_result and health_result.get('status') == 'healthy':
                 logger.info("Successfully connected to warehouse service")
             else:
                 logger.error("Warehouse service health check failed")
-        except Exception as e:
-            logger.error(f"Failed to connect to warehouse service: {e}")
+        except API_ERRORS as e:
+            logger.error("Failed to connect to warehouse service: %s", e)
 
     def step(self):
             """Execute one enhanced simulation step"""
             self.steps += 1
-            self.datacollector.collect(self)
-            self.schedule.step()
+            self._update_clock()
+            if self.datacollector is not None and self.steps % self.config.collect_interval == 0:
+                self._prefetch_metrics()
+                self.datacollector.collect(self)
+            if self.steps >= self._next_confirm_poll:
+                self._queue_pending_confirmations()
+            self._step_agents()
 
             # Periodic inventory restocking
             if self.steps % 100 == 0:
@@ -1044,54 +1334,120 @@ class EnhancedWarehouseModel(mesa.Model):
 
             # Weather delay simulation
             if (self.config.enable_operational_disruptions and
-                random.random() < self.config.weather_delay_probability):
+                self._weather_rolls.next() < self.config.weather_delay_probability):
                 self.total_weather_delays += 1
-                logger.info(f"Weather delay event at step {self.steps}")
+                logger.info("Weather delay event at step %s", self.steps)
 
             # Progress logging
             if self.steps % 100 == 0 and self.steps > 0:
                 self._log_comprehensive_status()
 
+    def _update_clock(self):
+        """Work out this step's hour of day once, for every agent to read"""
+        self.current_hour = (self.steps // 60) % 24
+        self.is_peak_hour = self.current_hour in PEAK_HOURS
+
+    def submit_order(self, customer: EnhancedCustomerAgent, request: Dict,
+                     selected_items: List[InventoryItem], priority: OrderPriority):
+        """Buffer an order placement; a full buffer is flushed immediately, the rest after the customer phase"""
+        with self._order_buffer_lock:
+            self._order_buffer.append((customer, request, selected_items, priority))
+            full = len(self._order_buffer) >= self.config.order_batch_size
+        if full:
+            self._flush_orders()
+
+    def _flush_orders(self):
+        """Create all buffered orders with one API call and hand each result back to its customer"""
+        with self._order_buffer_lock:
+            pending, self._order_buffer = self._order_buffer, []
+        if not pending:
+            return
+        
+        try:
+            orders = self.order_client.create_orders([request for _, request, _, _ in pending])
+        except API_ERRORS as e:
+            logger.error("Exception placing %s buffered orders: %s", len(pending), e)
+            orders = []
+        
+        for index, (customer, _, selected_items, priority) in enumerate(pending):
+            customer._record_order(orders[index] if index < len(orders) else None, selected_items, priority)
+
+    def _queue_pending_confirmations(self) -> int:
+        """Queue confirm tasks for the oldest pending orders, one per idle fulfillment agent.
+        Returns the number of tasks queued.
+        
+        Polling backs off exponentially while there is nothing pending, so idle
+        simulations do not hammer the API with empty lookups.
+        """
+        base_interval = self.config.fulfillment_check_interval
+        batch = max(1, self._count_idle_agents())
+        orders = []
+        queued = 0
+        try:
+            # Oldest pending orders first, selected server-side. Orders already given a confirm
+            # task are the oldest ones, so widen the page by their count and skip them.
+            orders = self.dispatch_client.get_orders_by_state(
+                'pending', limit=batch + len(self._confirm_queued), sort='created_at'
+            )
+            self._confirm_queued &= {order['order_id'] for order in orders}
+            for order in orders:
+                if queued >= batch:
+                    break
+                if order['order_id'] in self._confirm_queued:
+                    continue
+                self.dispatch_client.request_transition(
+                    order['order_id'],
+                    'confirm',
+                    notes="Auto-queued by fulfillment dispatcher",
+                    agent_id="fulfillment_dispatcher"
+                )
+                self._confirm_queued.add(order['order_id'])
+                queued += 1
+            logger.debug("Queued %d confirm tasks for pending orders", queued)
+        except API_ERRORS as e:
+            logger.debug("Error queuing pending confirmations: %s", e)
+        
+        if orders:
+            self._confirm_poll_interval = base_interval
+        else:
+            self._confirm_poll_interval = min(self._confirm_poll_interval * 2, base_interval * MAX_POLL_BACKOFF)
+        self._next_confirm_poll = self.steps + self._confirm_poll_interval
+        return queued
+
     def _restock_inventory(self):
         """Periodic inventory restocking"""
         low_stock_items = self.inventory_manager.get_low_stock_items()
         for item_name in low_stock_items:
-            restock_quantity = random.randint(20, 50)
+            restock_quantity = self.random.randint(20, 50)
             self.inventory_manager.restock_item(item_name, restock_quantity)
-            logger.info(f"Restocked {item_name}: +{restock_quantity} units")
+            logger.info("Restocked %s: +%s units", item_name, restock_quantity)
 
     def _log_comprehensive_status(self):
         """Log comprehensive simulation status"""
-        pipeline = self.total_orders_created - self.total_orders_completed - self.total_orders_cancelled
-        fulfillment_rate = (self.total_orders_completed / max(1, self.total_orders_created)) * 100
-        
-        working_agents = self._count_working_agents()
-        agents_on_break = self._count_agents_on_break()
-        broken_equipment = self._count_agents_with_broken_equipment()
+        # The agent counts are only needed for the log line
+        if not logger.isEnabledFor(logging.INFO):
+            return
         
         logger.info(
-            f"Step {self.steps}: Created={self.total_orders_created}, "
-            f"Completed={self.total_orders_completed}, "
-            f"Cancelled={self.total_orders_cancelled}, "
-            f"Express={self.total_express_orders}, "
-            f"Pipeline={pipeline}, "
-            f"Fulfillment={fulfillment_rate:.1f}%, "
-            f"Working={working_agents}, "
-            f"OnBreak={agents_on_break}, "
-            f"Broken={broken_equipment}, "
-            f"QualityFails={self.total_quality_failures}"
+            "Step %s: Created=%s, Completed=%s, Cancelled=%s, Express=%s, Pipeline=%s, "
+            "Fulfillment=%.1f%%, Working=%s, OnBreak=%s, Broken=%s, QualityFails=%s",
+            self.steps, self.total_orders_created, self.total_orders_completed,
+            self.total_orders_cancelled, self.total_express_orders, self.orders_in_pipeline,
+            self.fulfillment_rate, self._count_working_agents(), self._count_agents_on_break(),
+            self._count_agents_with_broken_equipment(), self.total_quality_failures
         )
 
     def run_model(self, steps=None):
         """Run the enhanced simulation"""
         target = steps or self.config.max_steps
-        logger.info(f"Starting enhanced simulation for {target} steps")
+        logger.info("Starting enhanced simulation for %s steps", target)
         
         while self.steps < target:
             self.step()
-            time.sleep(0.05)  # Slower for observation
+            if self.config.step_delay:
+                time.sleep(self.config.step_delay)  # Slower for observation
             
-        logger.info(f"Enhanced simulation completed after {self.steps} steps")
+        logger.info("Enhanced simulation completed after %s steps", self.steps)
         self._print_final_report()
 
     def _print_final_report(self):
@@ -1107,10 +1463,8 @@ class EnhancedWarehouseModel(mesa.Model):
         print(f"Total Express Orders: {self.total_express_orders}")
         
         if self.total_orders_created > 0:
-            fulfillment_rate = (self.total_orders_completed / self.total_orders_created) * 100
-            express_rate = (self.total_express_orders / self.total_orders_created) * 100
-            print(f"Fulfillment Rate: {fulfillment_rate:.1f}%")
-            print(f"Express Order Rate: {express_rate:.1f}%")
+            print(f"Fulfillment Rate: {self.fulfillment_rate:.1f}%")
+            print(f"Express Order Rate: {self.express_order_rate:.1f}%")
         
         print(f"\nOPERATIONAL METRICS:")
         print(f"Equipment Failures: {self.total_equipment_failures}")
@@ -1118,8 +1472,7 @@ class EnhancedWarehouseModel(mesa.Model):
         print(f"Weather Delays: {self.total_weather_delays}")
         
         if self.total_orders_processed > 0:
-            quality_rate = (self.total_quality_failures / self.total_orders_processed) * 100
-            print(f"Quality Failure Rate: {quality_rate:.1f}%")
+            print(f"Quality Failure Rate: {self.quality_failure_rate:.1f}%")
         
         print(f"\nINVENTORY STATUS:")
         inventory_summary = self.inventory_manager.get_inventory_summary()
@@ -1137,50 +1490,54 @@ def _get_or_create_model() -> EnhancedWarehouseModel:
     """Get global model instance"""
     global _global_model
     if _global_model is None:
+        setup_logging()
         config = SimulationConfig.from_env()
         _global_model = EnhancedWarehouseModel(config)
     return _global_model
 
+# Dashboard plots depend only on reporter names, so they are built once at import
+DASHBOARD_COMPONENTS = [
+    # Core metrics
+    make_plot_component("Total Orders Created"),
+    make_plot_component("Total Orders Completed"), 
+    make_plot_component("Total Express Orders"),
+    make_plot_component("Total Orders Cancelled"),
+    
+    # Performance metrics
+    make_plot_component("Fulfillment Rate (%)"),
+    make_plot_component("Express Order Rate (%)"),
+    make_plot_component("Quality Failure Rate (%)"),
+    
+    # State tracking
+    make_plot_component("Pending Orders"),
+    make_plot_component("Confirmed Orders"),
+    make_plot_component("Picking Orders"),
+    make_plot_component("Packed Orders"),
+    make_plot_component("Shipped Orders"),
+    make_plot_component("Delivered Orders"),
+    
+    # Operational metrics
+    make_plot_component("Equipment Failures"),
+    make_plot_component("Quality Failures"),
+    make_plot_component("Agents Working"),
+    make_plot_component("Agents on Break"),
+    make_plot_component("Agents with Broken Equipment"),
+    
+    # Inventory and capacity
+    make_plot_component("Low Stock Items"),
+    make_plot_component("Total Reserved Items"),
+    make_plot_component("Queue Size"),
+    make_plot_component("Orders in Pipeline"),
+]
+
 @solara.component
 def Page():
     """Enhanced Solara visualization dashboard"""
-    model = _get_or_create_model()
-    components = [
-        # Core metrics
-        make_plot_component("Total Orders Created"),
-        make_plot_component("Total Orders Completed"), 
-        make_plot_component("Total Express Orders"),
-        make_plot_component("Total Orders Cancelled"),
-        
-        # Performance metrics
-        make_plot_component("Fulfillment Rate (%)"),
-        make_plot_component("Express Order Rate (%)"),
-        make_plot_component("Quality Failure Rate (%)"),
-        
-        # State tracking
-        make_plot_component("Pending Orders"),
-        make_plot_component("Confirmed Orders"),
-        make_plot_component("Picking Orders"),
-        make_plot_component("Packed Orders"),
-        make_plot_component("Shipped Orders"),
-        make_plot_component("Delivered Orders"),
-        
-        # Operational metrics
-        make_plot_component("Equipment Failures"),
-        make_plot_component("Quality Failures"),
-        make_plot_component("Agents Working"),
-        make_plot_component("Agents on Break"),
-        make_plot_component("Agents with Broken Equipment"),
-        
-        # Inventory and capacity
-        make_plot_component("Low Stock Items"),
-        make_plot_component("Total Reserved Items"),
-        make_plot_component("Queue Size"),
-        make_plot_component("Orders in Pipeline"),
-    ]
+    # Resolve the model once per mounted page rather than on every re-render
+    model = solara.use_memo(_get_or_create_model, dependencies=[])
     return SolaraViz(
         model, 
-        components=components, 
+        components=DASHBOARD_COMPONENTS, 
         name="Enhanced Warehouse Simulation Dashboard"
     )
 
@@ -1189,6 +1546,7 @@ def make_solara_viz_server(config):
     """
     Creates and configures the Solara visualization server.
     """
+    setup_logging()
     model = EnhancedWarehouseModel(config)
     components = [
         # Dashboard metrics